@@ -1,25 +1,225 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+import logging
 import os
+import threading
+import time
+
+from . import metrics
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
 # SQLite database file will be created in backend folder
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./2know.db")
+# (postgres:// is what Railway/Heroku hand out; SQLAlchemy only accepts postgresql://)
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./2know.db").replace("postgres://", "postgresql://", 1)
+
+# SQLite profile: WAL lets readers run alongside the single writer,
+# synchronous=NORMAL is durable under WAL without an fsync per commit
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Postgres profile: per-process pool sizing (multiply by workers to stay
+# under the server's max_connections)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Pool checkout wait (time spent getting a connection, including opening new ones)
+_checkout_stats = {}
+_checkout_lock = threading.Lock()
+
+
+DB_POOL_CHECKOUT_LATENCY = metrics.histogram(
+    "twoknow_db_pool_checkout_seconds",
+    "Time spent getting a connection from the pool (including opening new ones).",
+    labels=("engine",)
+)
+
+
+def _record_checkout(pool_name: str, waited: float):
+    DB_POOL_CHECKOUT_LATENCY.observe(waited, engine=pool_name)
+    with _checkout_lock:
+        stats = _checkout_stats.setdefault(pool_name, {'checkouts': 0, 'wait_total': 0.0, 'wait_max': 0.0})
+        stats['checkouts'] += 1
+        stats['wait_total'] += waited
+        stats['wait_max'] = max(stats['wait_max'], waited)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits."""
+
+    metrics_name = 'sync'
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _record_checkout(self.metrics_name, time.perf_counter() - started)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waits."""
+
+    metrics_name = 'async'
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _record_checkout(self.metrics_name, time.perf_counter() - started)
+
+
+# SQLAlchemy names pool loggers after the pool class; keep ours as quiet as its own
+for _pool_class in (TimedQueuePool, TimedAsyncQueuePool):
+    logging.getLogger(f"{__name__}.{_pool_class.__name__}").setLevel(logging.WARNING)
+
+
+def _is_sqlite_memory(url):
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _engine_options(url, pool_class):
+    """Engine keyword arguments for the profile matching this URL."""
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        if _is_sqlite_memory(url):
+            # In-memory databases live in a single connection; keep SQLAlchemy's default pool
+            return {}
+        return {"poolclass": pool_class, "pool_timeout": DB_POOL_TIMEOUT}
+    return {
+        "poolclass": pool_class,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Runs once per new connection; works for both sqlite3 and aiosqlite
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+
+def _apply_profile(sync_engine):
+    if sync_engine.url.get_backend_name() == "sqlite" and not _is_sqlite_memory(sync_engine.url):
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+
+
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+_connect_args = {"check_same_thread": False} if _url.get_backend_name() == "sqlite" else {}
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    _url, connect_args=_connect_args, **_engine_options(_url, TimedQueuePool)
 )
+_apply_profile(engine)
+metrics.instrument_engine(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+
+def _async_database_url(database_url: str):
+    """
+    Map DATABASE_URL onto an asyncio driver: aiosqlite for SQLite,
+    asyncpg for Postgres. Returns (url, connect_args).
+    """
+    url = make_url(database_url)
+    connect_args = {}
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    elif backend == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+        # asyncpg takes ssl as a connect argument rather than libpq's sslmode
+        sslmode = url.query.get("sslmode")
+        if sslmode:
+            url = url.difference_update_query(["sslmode"])
+            if sslmode != "disable":
+                connect_args["ssl"] = sslmode
+    return url, connect_args
+
+
+ASYNC_DATABASE_URL, _async_connect_args = _async_database_url(SQLALCHEMY_DATABASE_URL)
+
+# Async engine for request handlers, so queries and commits don't block the event loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, connect_args=_async_connect_args,
+    **_engine_options(ASYNC_DATABASE_URL, TimedAsyncQueuePool)
+)
+_apply_profile(async_engine.sync_engine)
+metrics.instrument_engine(async_engine.sync_engine, "async")
+# expire_on_commit=False: attributes stay readable after commit without an implicit (sync) reload
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _pool_stats(name, pool):
+    stats = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': pool.overflow()
+        })
+    with _checkout_lock:
+        waits = dict(_checkout_stats.get(name, {'checkouts': 0, 'wait_total': 0.0, 'wait_max': 0.0}))
+    stats['checkouts'] = waits['checkouts']
+    stats['checkout_wait_avg_ms'] = round(waits['wait_total'] / waits['checkouts'] * 1000, 3) if waits['checkouts'] else 0.0
+    stats['checkout_wait_max_ms'] = round(waits['wait_max'] * 1000, 3)
+    stats['checkout_wait_total_seconds'] = round(waits['wait_total'], 3)
+    return stats
+
+
+def get_db_stats():
+    """Engine profile and connection pool statistics for both engines."""
+    return {
+        'backend': _url.get_backend_name(),
+        'sync': _pool_stats('sync', engine.pool),
+        'async': _pool_stats('async', async_engine.pool)
+    }
+
+
+def _collect_checked_out():
+    return [
+        ((name,), pool.checkedout())
+        for name, pool in (("sync", engine.pool), ("async", async_engine.pool))
+        if isinstance(pool, QueuePool)
+    ]
+
+
+metrics.register_callback(
+    "twoknow_db_pool_checked_out", "gauge",
+    "Database connections currently checked out of the pool.",
+    ("engine",), _collect_checked_out
+)
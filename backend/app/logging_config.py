@@ -0,0 +1,141 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Log records are put on an in-memory queue by the calling thread and written
+# to stdout by a background listener thread, so request handlers never block
+# on the log pipe.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Per-module overrides, e.g. "app.services.google_trends_service=WARNING,app.services.cache=ERROR"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# "json" (one object per line, for the log pipeline) or "text" (local development)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, message, extra fields, exception."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _DropWhenFullQueueHandler(logging.handlers.QueueHandler):
+    """Never block the caller: if the listener falls behind, drop the record."""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Resolve the message and traceback now (the args may change later),
+        # but leave formatting to the listener's handler
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DropWhenFullQueueHandler.dropped += 1
+
+
+def _parse_levels(spec: str):
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging():
+    """
+    Route the app's loggers through a queue-backed handler. Safe to call
+    more than once; only the first call installs handlers.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "text":
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(LOG_LEVEL)
+    app_logger.addHandler(_DropWhenFullQueueHandler(log_queue))
+    app_logger.propagate = False
+
+    for name, level in _parse_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def create_queue_logger(name: str, handler: logging.Handler):
+    """
+    A non-propagating logger whose records are written to `handler` by its
+    own background listener (used for side channels such as span export).
+    """
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    side_logger = logging.getLogger(name)
+    side_logger.setLevel(logging.INFO)
+    side_logger.addHandler(_DropWhenFullQueueHandler(log_queue))
+    side_logger.propagate = False
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return side_logger
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logging_stats():
+    return {
+        "level": LOG_LEVEL,
+        "overrides": _parse_levels(LOG_LEVELS),
+        "format": LOG_FORMAT,
+        "dropped_records": _DropWhenFullQueueHandler.dropped
+    }
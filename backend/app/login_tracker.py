@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from sqlalchemy import bindparam, update
+from dotenv import load_dotenv
+from . import models
+from .database import AsyncSessionLocal
+from .user_cache import invalidate_user
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Write-behind for users.last_login: logins record a timestamp in memory and a
+# background task writes them in one batch, every LOGIN_FLUSH_INTERVAL_MS or as
+# soon as LOGIN_FLUSH_BATCH_SIZE users are pending, whichever comes first.
+LOGIN_FLUSH_INTERVAL_MS = int(os.getenv("LOGIN_FLUSH_INTERVAL_MS", "1000"))
+LOGIN_FLUSH_BATCH_SIZE = int(os.getenv("LOGIN_FLUSH_BATCH_SIZE", "200"))
+
+# user_id -> latest login time not yet written
+_pending = {}
+_batch_ready = None
+_flusher_task = None
+_flush_lock = None
+
+_stats = {
+    'recorded': 0,
+    'flushes': 0,
+    'rows_written': 0,
+    'failed_flushes': 0,
+    'last_flush_seconds': 0.0
+}
+
+
+def record_login(user_id: int, when: datetime = None):
+    """Queue a last_login update and return the timestamp used."""
+    when = when or datetime.utcnow()
+    _pending[user_id] = when
+    _stats['recorded'] += 1
+    if _batch_ready is not None and len(_pending) >= LOGIN_FLUSH_BATCH_SIZE:
+        _batch_ready.set()
+    return when
+
+
+def last_login_for(user: models.User):
+    """The user's last_login, including a login that hasn't been written yet."""
+    return _pending.get(user.id, user.last_login)
+
+
+async def flush():
+    """Write every pending last_login in one transaction. Returns rows written."""
+    global _flush_lock
+    if _flush_lock is None:
+        _flush_lock = asyncio.Lock()
+
+    async with _flush_lock:
+        if not _pending:
+            return 0
+        batch = dict(_pending)
+        _pending.clear()
+        started = time.time()
+        try:
+            async with AsyncSessionLocal() as db:
+                # Core executemany: one statement for the batch. Unlike the ORM
+                # bulk update it has no matched-rowcount check, so a user deleted
+                # since logging in is skipped instead of failing every flush.
+                users = models.User.__table__
+                result = await db.execute(
+                    update(users)
+                    .where(users.c.id == bindparam("user_id"))
+                    .values(last_login=bindparam("login_at")),
+                    [{"user_id": user_id, "login_at": when} for user_id, when in batch.items()]
+                )
+                await db.commit()
+        except BaseException as e:
+            # Put the batch back unless a newer login arrived meanwhile
+            for user_id, when in batch.items():
+                _pending.setdefault(user_id, when)
+            if not isinstance(e, Exception):
+                raise  # cancelled at shutdown: the final flush picks these up
+            _stats['failed_flushes'] += 1
+            logger.warning("last_login flush failed for %d users: %s", len(batch), e)
+            return 0
+
+        # Cached user snapshots still carry the previous last_login
+        for user_id in batch:
+            invalidate_user(user_id)
+        _stats['flushes'] += 1
+        written = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(batch)
+        _stats['rows_written'] += written
+        _stats['last_flush_seconds'] = round(time.time() - started, 4)
+        return written
+
+
+async def _flush_loop():
+    while True:
+        try:
+            await asyncio.wait_for(_batch_ready.wait(), LOGIN_FLUSH_INTERVAL_MS / 1000)
+        except asyncio.TimeoutError:
+            pass
+        _batch_ready.clear()
+        try:
+            await flush()
+        except Exception as e:
+            logger.exception("last_login flusher error: %s", e)
+
+
+def start_login_tracker():
+    """Start the background flusher. Called from the FastAPI lifespan."""
+    global _flusher_task, _batch_ready
+    if _batch_ready is None:
+        _batch_ready = asyncio.Event()
+    if _flusher_task is None or _flusher_task.done():
+        _flusher_task = asyncio.create_task(_flush_loop())
+    return _flusher_task
+
+
+async def stop_login_tracker():
+    """Stop the flusher and write whatever is still pending."""
+    global _flusher_task, _batch_ready
+    if _flusher_task is not None:
+        _flusher_task.cancel()
+        try:
+            await _flusher_task
+        except asyncio.CancelledError:
+            pass
+    _flusher_task = None
+    _batch_ready = None
+    await flush()
+
+
+def get_login_tracker_stats():
+    stats = dict(_stats)
+    stats['pending'] = len(_pending)
+    stats['flush_interval_ms'] = LOGIN_FLUSH_INTERVAL_MS
+    stats['flush_batch_size'] = LOGIN_FLUSH_BATCH_SIZE
+    stats['running'] = _flusher_task is not None and not _flusher_task.done()
+    return stats
@@ -1,38 +1,73 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, PlainTextResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List
 from datetime import datetime
+from contextlib import asynccontextmanager
+import asyncio
 import os
-import traceback
+import json
+import logging
+
+# Structured, queue-backed logging; set up before the modules below log at import
+from .logging_config import setup_logging, get_logging_stats
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # Import our modules
 from . import models
-from .database import engine, get_db, SessionLocal
+from .migrations import run_migrations
+from .database import engine, async_engine, get_async_db, get_db_stats, AsyncSessionLocal
 from .auth import create_jwt_token, verify_jwt_token, hash_password, verify_password
-from .services.trends_service import get_trend_analysis
+from .services.trends_service import get_trend_analysis, iter_trend_analyses, get_regional_comparison, REGIONAL_MARKETS
+from .services import http_client, cache, cache_warmer
+from .user_cache import get_cached_user, cache_user, invalidate_user, get_user_cache_stats
+from . import login_tracker, metrics, tracing
 
 # Import Pydantic models
 from pydantic import BaseModel
 
 # Create database tables
-print("📊 Creating database tables...")
+logger.info("Creating database tables...")
 try:
     models.Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created/verified")
+    run_migrations(engine)
+    logger.info("Database tables created/verified")
 except Exception as e:
-    print(f"❌ Error creating tables: {e}")
+    logger.error("Error creating tables: %s", e)
 
 # Security scheme for JWT tokens
 security = HTTPBearer()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: one pooled HTTP client shared by all outbound API calls
+    await http_client.start_http_client()
+    # Periodically drop expired cache entries so idle keys don't pile up
+    cache.start_sweeper()
+    # Refresh popular keywords before their cache entries expire
+    cache_warmer.start_warmer()
+    # Batch last_login writes instead of committing on every login
+    login_tracker.start_login_tracker()
+    yield
+    # Shutdown: stop background tasks and close pooled connections
+    await login_tracker.stop_login_tracker()
+    await cache_warmer.stop_warmer()
+    await cache.stop_sweeper()
+    await cache.close_cache_backends()
+    await http_client.close_http_client()
+    await async_engine.dispose()
+
 app = FastAPI(
     title="2KNOW Market Trend Predictor",
     description="Real-time market trend analysis for Kenya",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Allow frontend to call backend
@@ -47,6 +82,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request durations for /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+# Sampled per-stage timings (Server-Timing header, optional span file)
+app.add_middleware(tracing.TracingMiddleware)
+
 # Pydantic models for request/response
 class UserRegister(BaseModel):
     email: str
@@ -58,6 +98,17 @@ class UserLogin(BaseModel):
     email: str
     password: str
 
+class TrendsBatchRequest(BaseModel):
+    keywords: List[str]
+    regions: List[str] = ["KE"]
+
+# Upper bound on keyword x region pairs accepted in one batch request
+MAX_BATCH_ITEMS = int(os.getenv("TRENDS_BATCH_MAX_ITEMS", "1000"))
+
+# /debug/users page size cap, and rows fetched per round trip by the NDJSON export
+USERS_PAGE_MAX_LIMIT = int(os.getenv("USERS_PAGE_MAX_LIMIT", "1000"))
+USERS_EXPORT_CHUNK_SIZE = int(os.getenv("USERS_EXPORT_CHUNK_SIZE", "1000"))
+
 class UserProfile(BaseModel):
     id: int
     email: str
@@ -69,7 +120,7 @@ class UserProfile(BaseModel):
 # Authentication dependency
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> models.User:
     """
     Get current user from JWT token
@@ -93,8 +144,14 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Serve from the user cache when possible (read-only copy, no DB round trip)
+    cached_user = get_cached_user(user_id)
+    if cached_user is not None:
+        return cached_user
+    
     # Get user from database
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    result = await db.execute(select(models.User).where(models.User.id == user_id))
+    user = result.scalars().first()
     
     if not user:
         raise HTTPException(
@@ -102,7 +159,7 @@ async def get_current_user(
             detail="User not found"
         )
     
-    return user
+    return cache_user(user)
 
 async def get_current_active_user(current_user: models.User = Depends(get_current_user)):
     """Get current active user"""
@@ -133,11 +190,11 @@ def serve_app():
     return {"error": "Dashboard not found"}
 
 @app.post("/auth/register")
-async def register(user: UserRegister, db: Session = Depends(get_db)):
+async def register(user: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user
     """
-    print(f"👤 Registration attempt for: {user.email}")
+    logger.info("Registration attempt for: %s", user.email)
     
     # Validation
     if not user.email or not user.email.strip():
@@ -165,13 +222,15 @@ async def register(user: UserRegister, db: Session = Depends(get_db)):
             detail="Invalid email format"
         )
     
-    # Check if user exists
-    existing_user = db.query(models.User).filter(
-        (models.User.email == user.email) | (models.User.username == user.username)
-    ).first()
+    # Check if user exists: one indexed lookup on email_lower OR username
+    email_lower = models.normalize_email(user.email)
+    result = await db.execute(select(models.User.email_lower).where(
+        (models.User.email_lower == email_lower) | (models.User.username == user.username.strip())
+    ))
+    existing_emails = result.scalars().all()
     
-    if existing_user:
-        if existing_user.email == user.email:
+    if existing_emails:
+        if email_lower in existing_emails:
             detail = "Email already registered"
         else:
             detail = "Username already taken"
@@ -191,13 +250,13 @@ async def register(user: UserRegister, db: Session = Depends(get_db)):
         )
         
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
         
         # Create JWT token
         token = create_jwt_token({"user_id": new_user.id, "email": new_user.email})
         
-        print(f"✅ User registered successfully: {user.email} (ID: {new_user.id})")
+        logger.info("User registered successfully: %s (ID: %s)", user.email, new_user.id)
         
         return {
             "access_token": token,
@@ -213,9 +272,8 @@ async def register(user: UserRegister, db: Session = Depends(get_db)):
         }
         
     except Exception as e:
-        print(f"❌ Registration error: {e}")
-        traceback.print_exc()
-        db.rollback()
+        logger.exception("Registration error: %s", e)
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Registration failed. Please try again."
@@ -223,11 +281,11 @@ async def register(user: UserRegister, db: Session = Depends(get_db)):
 
 # Login user - REAL LOGIN, NO DEMO
 @app.post("/auth/login")
-async def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login with email and password
     """
-    print(f"🔐 Login attempt for: {user.email}")
+    logger.info("Login attempt for: %s", user.email)
     
     if not user.email or not user.password:
         raise HTTPException(
@@ -236,13 +294,14 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
         )
     
     try:
-        # Find user (case-insensitive email search)
-        db_user = db.query(models.User).filter(
-            models.User.email.ilike(user.email.strip())
-        ).first()
+        # Find user (case-insensitive via the indexed email_lower column)
+        result = await db.execute(select(models.User).where(
+            models.User.email_lower == models.normalize_email(user.email)
+        ))
+        db_user = result.scalars().first()
         
         if not db_user:
-            print(f"❌ User not found: {user.email}")
+            logger.info("User not found: %s", user.email)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password",
@@ -251,22 +310,20 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
         
         # Verify password using the verify_password function
         if not verify_password(user.password, db_user.password_hash):
-            print(f"❌ Invalid password for: {user.email}")
+            logger.info("Invalid password for: %s", user.email)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Update last login
-        db_user.last_login = datetime.utcnow()
-        db.commit()
-        db.refresh(db_user)
+        # Queue the last_login update; it is written in the next batch
+        last_login = login_tracker.record_login(db_user.id)
         
         # Create JWT token
         token = create_jwt_token({"user_id": db_user.id, "email": db_user.email})
         
-        print(f"✅ User logged in successfully: {user.email}")
+        logger.info("User logged in successfully: %s", user.email)
         
         return {
             "access_token": token,
@@ -277,15 +334,14 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
                 "username": db_user.username,
                 "full_name": db_user.full_name,
                 "created_at": db_user.created_at,
-                "last_login": db_user.last_login
+                "last_login": last_login
             }
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Login error: {e}")
-        traceback.print_exc()
+        logger.exception("Login error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Login failed. Please try again."
@@ -297,7 +353,7 @@ async def get_profile(current_user: models.User = Depends(get_current_active_use
     """
     Get current user profile (requires valid JWT token)
     """
-    print(f"📊 Profile request for: {current_user.email}")
+    logger.debug("Profile request for: %s", current_user.email)
     
     # Return the user profile with all required fields
     return {
@@ -306,7 +362,7 @@ async def get_profile(current_user: models.User = Depends(get_current_active_use
         "username": current_user.username,
         "full_name": current_user.full_name or "",
         "created_at": current_user.created_at,
-        "last_login": current_user.last_login
+        "last_login": login_tracker.last_login_for(current_user)
     }
 
 # Update user profile
@@ -314,32 +370,43 @@ async def get_profile(current_user: models.User = Depends(get_current_active_use
 async def update_profile(
     update_data: dict,
     current_user: models.User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update user profile
     """
     try:
+        # current_user may be a cached read-only copy, so load the row to update it
+        db_user = await db.get(models.User, current_user.id)
+        if not db_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
         # Update allowed fields
         if "full_name" in update_data:
-            current_user.full_name = update_data["full_name"]
+            db_user.full_name = update_data["full_name"]
         
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        await db.refresh(db_user)
+        invalidate_user(db_user.id)
         
         return {
             "message": "Profile updated successfully",
             "user": {
-                "id": current_user.id,
-                "email": current_user.email,
-                "username": current_user.username,
-                "full_name": current_user.full_name,
-                "created_at": current_user.created_at,
-                "last_login": current_user.last_login
+                "id": db_user.id,
+                "email": db_user.email,
+                "username": db_user.username,
+                "full_name": db_user.full_name,
+                "created_at": db_user.created_at,
+                "last_login": login_tracker.last_login_for(db_user)
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update profile: {str(e)}"
@@ -350,7 +417,7 @@ async def update_profile(
 async def change_password(
     password_data: dict,
     current_user: models.User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Change user password
@@ -365,27 +432,64 @@ async def change_password(
                 detail="Current password and new password are required"
             )
         
+        # Load the row; current_user may be a cached read-only copy
+        db_user = await db.get(models.User, current_user.id)
+        if not db_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
         # Verify current password
-        if not verify_password(current_password, current_user.password_hash):
+        if not verify_password(current_password, db_user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
             )
         
         # Update password
-        current_user.password_hash = hash_password(new_password)
-        db.commit()
+        db_user.password_hash = hash_password(new_password)
+        await db.commit()
+        invalidate_user(db_user.id)
         
         return {"message": "Password changed successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to change password: {str(e)}"
         )
 
+# All-regions comparison: keyword x region score matrix for the heatmap
+@app.get("/trends/compare/regions")
+async def compare_regions(keywords: str, regions: Optional[str] = None):
+    """
+    Score keywords across regions in one request.
+    Query params: keywords (comma-separated), regions (optional, comma-separated; default: all regions)
+    """
+    keyword_list = [k.strip() for k in keywords.split(",") if k.strip()]
+    region_list = [r.strip() for r in regions.split(",") if r.strip()] if regions else None
+    if not keyword_list:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one keyword is required"
+        )
+    if len(keyword_list) * len(region_list or REGIONAL_MARKETS) > MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many keyword/region pairs (max {MAX_BATCH_ITEMS})"
+        )
+
+    logger.info("Regional comparison for: %s", ", ".join(keyword_list))
+    return await get_regional_comparison(keyword_list, region_list)
+
+def _traced_json(result):
+    """Encode a response inside a span so Server-Timing shows serialization cost."""
+    with tracing.span("serialize"):
+        return JSONResponse(jsonable_encoder(result))
+
 # Public trends endpoint with region support
 @app.get("/trends/{keyword}")
 async def get_public_trends(keyword: str, region: str = "KE"):
@@ -394,11 +498,10 @@ async def get_public_trends(keyword: str, region: str = "KE"):
     Query params: keyword (required), region (optional, default: KE)
     """
     try:
-        print(f"🔍 Analyzing trends for: {keyword} in {region}")
         result = await get_trend_analysis(keyword, region=region)
-        return result
+        return _traced_json(result)
     except Exception as e:
-        print(f"❌ Error analyzing trends: {e}")
+        logger.exception("Error analyzing trends: %s", e)
         # Return demo data for testing if real API fails
         region_data = {
             "keyword": keyword,
@@ -420,6 +523,35 @@ async def get_public_trends(keyword: str, region: str = "KE"):
         }
         return region_data
 
+# Batch trends endpoint: many keywords x regions in one request, streamed as NDJSON
+@app.post("/trends/batch")
+async def get_batch_trends(batch: TrendsBatchRequest):
+    """
+    Analyse every keyword in every region. Each result is written as one
+    JSON line as soon as it is ready, so callers can process results while
+    the rest of the batch is still running.
+    """
+    keywords = [k for k in batch.keywords if k and k.strip()]
+    regions = batch.regions or ["KE"]
+    if not keywords:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one keyword is required"
+        )
+    if len(keywords) * len(regions) > MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch too large (max {MAX_BATCH_ITEMS} keyword/region pairs)"
+        )
+
+    logger.info("Batch trends request: %d keywords x %d regions", len(keywords), len(regions))
+
+    async def ndjson_lines():
+        async for result in iter_trend_analyses(keywords, regions):
+            yield json.dumps(result, default=str) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
 # Protected trends endpoint (requires JWT)
 @app.get("/api/trends/{keyword}")
 async def get_protected_trends(
@@ -439,48 +571,133 @@ async def get_protected_trends(
         result = await get_trend_analysis(keyword)
         result["user"] = current_user.email
         result["user_id"] = current_user.id
-        return result
+        return _traced_json(result)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error analyzing trends: {str(e)}"
         )
 
-# Debug endpoint to see all users
+# Columns listed by the user debug endpoints (no password hashes, no ORM objects)
+USER_LISTING_COLUMNS = (
+    models.User.id,
+    models.User.email,
+    models.User.username,
+    models.User.full_name,
+    models.User.created_at,
+    models.User.last_login
+)
+
+def _user_row(row):
+    return {
+        "id": row.id,
+        "email": row.email,
+        "username": row.username,
+        "full_name": row.full_name,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "last_login": row.last_login.isoformat() if row.last_login else None
+    }
+
+# Debug endpoint to list users, one page at a time
 @app.get("/debug/users")
-async def get_users(db: Session = Depends(get_db)):
-    """Debug endpoint to see all users"""
-    users = db.query(models.User).all()
+async def get_users(after_id: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    """
+    Debug endpoint to list users, ordered by id.
+    Query params: after_id (cursor, default 0), limit (default 100).
+    Pass the returned next_cursor as after_id to get the next page.
+    """
+    limit = max(1, min(limit, USERS_PAGE_MAX_LIMIT))
+    # Keyset pagination: the primary key index finds the page start directly
+    result = await db.execute(
+        select(*USER_LISTING_COLUMNS)
+        .where(models.User.id > after_id)
+        .order_by(models.User.id)
+        .limit(limit)
+    )
+    users = [_user_row(row) for row in result]
     return {
         "count": len(users),
-        "users": [
-            {
-                "id": u.id,
-                "email": u.email,
-                "username": u.username,
-                "full_name": u.full_name,
-                "created_at": u.created_at.isoformat() if u.created_at else None,
-                "last_login": u.last_login.isoformat() if u.last_login else None
-            }
-            for u in users
-        ]
+        "users": users,
+        "next_cursor": users[-1]["id"] if len(users) == limit else None
     }
 
-# Debug: trends metrics (cache hits, retries, 429s, fallbacks)
+# Debug endpoint to export every user as NDJSON
+@app.get("/debug/users/export")
+async def export_users():
+    """
+    Stream all users as NDJSON, one user per line. Rows are read from the
+    database in chunks of USERS_EXPORT_CHUNK_SIZE, so memory use does not
+    grow with the table.
+    """
+    async def ndjson_lines():
+        # Own session: the stream outlives the request handler
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(
+                select(*USER_LISTING_COLUMNS)
+                .order_by(models.User.id)
+                .execution_options(yield_per=USERS_EXPORT_CHUNK_SIZE)
+            )
+            async for rows in result.partitions():
+                yield "".join(json.dumps(_user_row(row)) + "\n" for row in rows)
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+# Debug: trends metrics (cache hits, retries, 429s, fallbacks, circuit breaker)
 @app.get("/debug/trends-metrics")
 async def debug_trends_metrics():
     try:
         from .services.google_trends_service import get_trends_metrics
-        return get_trends_metrics()
+        stats = get_trends_metrics()
+        stats['warmer'] = cache_warmer.get_warmer_stats()
+        from .services.trend_store import get_store_stats
+        # Full-table count on the sync engine: keep it off the event loop
+        stats['store'] = await asyncio.to_thread(get_store_stats)
+        return stats
     except Exception as e:
         return {"error": str(e)}
 
+# Debug: outbound HTTP connection pool (active/idle connections, handshakes)
+@app.get("/debug/http-pool")
+async def debug_http_pool():
+    return http_client.get_pool_stats()
+
+# Debug: Serper result cache (hits, misses, evictions) and circuit breaker
+@app.get("/debug/serper-metrics")
+async def debug_serper_metrics():
+    from .services.serper_service import get_serper_metrics
+    return get_serper_metrics()
+
+# Debug: authenticated-user cache
+@app.get("/debug/user-cache")
+async def debug_user_cache():
+    return get_user_cache_stats()
+
+# Prometheus scrape endpoint: latency histograms, cache hit ratios, in-flight gauges
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# Debug: log levels and records dropped by the log queue
+@app.get("/debug/logging")
+async def debug_logging():
+    return get_logging_stats()
+
+# Debug: pending last_login writes
+@app.get("/debug/login-tracker")
+async def debug_login_tracker():
+    return login_tracker.get_login_tracker_stats()
+
+# Debug: database engine profile and pool checkout waits
+@app.get("/debug/db-metrics")
+async def debug_db_metrics():
+    return get_db_stats()
+
 # Test database connection
 @app.get("/test/db")
-async def test_db(db: Session = Depends(get_db)):
+async def test_db(db: AsyncSession = Depends(get_async_db)):
     """Test database connection"""
     try:
-        count = db.query(models.User).count()
+        count = await db.scalar(select(func.count(models.User.id)))
         return {
             "connected": True,
             "user_count": count,
@@ -491,20 +708,22 @@ async def test_db(db: Session = Depends(get_db)):
 
 # Clean up any existing demo user
 @app.delete("/cleanup/demo")
-async def cleanup_demo(db: Session = Depends(get_db)):
+async def cleanup_demo(db: AsyncSession = Depends(get_async_db)):
     """Remove demo user if exists"""
     try:
-        demo_user = db.query(models.User).filter(
+        result = await db.execute(select(models.User).where(
             models.User.email == "demo@2know.com"
-        ).first()
+        ))
+        demo_user = result.scalars().first()
         
         if demo_user:
-            db.delete(demo_user)
-            db.commit()
+            await db.delete(demo_user)
+            await db.commit()
+            invalidate_user(demo_user.id)
             return {"deleted": True, "email": "demo@2know.com"}
         return {"deleted": False, "message": "Demo user not found"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 # Logout endpoint (invalidate token on frontend)
@@ -520,11 +739,12 @@ async def logout():
 @app.get("/auth/stats")
 async def get_user_stats(current_user: models.User = Depends(get_current_active_user)):
     """Get user statistics"""
+    last_login = login_tracker.last_login_for(current_user)
     return {
         "user_id": current_user.id,
         "email": current_user.email,
         "account_created": current_user.created_at.isoformat() if current_user.created_at else None,
-        "last_login": current_user.last_login.isoformat() if current_user.last_login else None,
+        "last_login": last_login.isoformat() if last_login else None,
         "member_for_days": (datetime.utcnow() - current_user.created_at).days if current_user.created_at else 0,
         "is_active": True
     }
@@ -537,14 +757,14 @@ static_dir = os.path.join(os.path.dirname(__file__), "static")
 
 # Check if static directory exists
 if os.path.exists(static_dir):
-    print(f"📁 Static directory found: {static_dir}")
+    logger.info("Static directory found: %s", static_dir)
     
     # Mount the entire static directory at root
     # html=True allows serving index.html for directory requests
     app.mount("/", StaticFiles(directory=static_dir, html=True), name="static")
-    print("✅ Static files mounted at root")
+    logger.info("Static files mounted at root")
 else:
-    print(f"⚠️  Static directory not found: {static_dir}")
+    logger.warning("Static directory not found: %s", static_dir)
 
 # Fallback for SPA routing - catch all other routes
 @app.get("/{full_path:path}")
@@ -556,4 +776,4 @@ async def serve_spa(full_path: str):
     return {"message": "2KNOW API is running but frontend files not found"}
 
 # ============ DEPLOYMENT COMPLETE ============
-print("🚀 2KNOW API started successfully!")
\ No newline at end of file
+logger.info("2KNOW API started successfully!")
\ No newline at end of file
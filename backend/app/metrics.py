@@ -0,0 +1,273 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Process-wide metrics registry, exported at /metrics in the Prometheus text
+# format. Every metric has its own lock, so updates are safe from request
+# handlers, worker threads (pytrends, trend store) and SQLAlchemy events alike.
+
+# Latency buckets in seconds: fast cache/DB paths up to slow upstream retries
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = {}
+_callbacks = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (in-flight work, queue depth)."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Latency distribution with cumulative buckets, for p50/p99 via histogram_quantile."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with-block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(float(bound))}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def _register(cls, name, documentation, labels, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, documentation, labels, **kwargs)
+        return metric
+
+
+def counter(name: str, documentation: str, labels=()):
+    return _register(Counter, name, documentation, labels)
+
+
+def gauge(name: str, documentation: str, labels=()):
+    return _register(Gauge, name, documentation, labels)
+
+
+def histogram(name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram, name, documentation, labels, buckets=buckets)
+
+
+def register_callback(name: str, kind: str, documentation: str, labels, collect):
+    """
+    Export values owned elsewhere (cache stats, pool sizes) at scrape time.
+    collect() returns a list of (label values tuple, value).
+    """
+    with _registry_lock:
+        _callbacks.append((name, kind, documentation, tuple(labels), collect))
+
+
+def render():
+    """Every metric in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+        callbacks = list(_callbacks)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    for name, kind, documentation, labelnames, collect in callbacks:
+        try:
+            samples = collect()
+        except Exception as e:
+            logger.warning("Metrics callback %s failed: %s", name, e)
+            continue
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        for values, value in samples:
+            lines.append(f"{name}{_format_labels(labelnames, values)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# Shared metrics used across the app
+UPSTREAM_LATENCY = histogram(
+    "twoknow_upstream_request_seconds",
+    "Latency of calls to upstream APIs.",
+    labels=("upstream", "outcome")
+)
+DB_QUERY_LATENCY = histogram(
+    "twoknow_db_query_seconds",
+    "Latency of database statements.",
+    labels=("engine",)
+)
+TREND_ANALYSIS_LATENCY = histogram(
+    "twoknow_trend_analysis_seconds",
+    "Duration of a full get_trend_analysis run (cache, Serper and Google Trends).",
+    labels=("freshness",)
+)
+HTTP_REQUEST_LATENCY = histogram(
+    "twoknow_http_request_seconds",
+    "Duration of HTTP requests handled by the API, by route template.",
+    labels=("method", "route", "status")
+)
+HTTP_REQUESTS_IN_PROGRESS = gauge(
+    "twoknow_http_requests_in_progress",
+    "HTTP requests currently being handled."
+)
+
+
+def instrument_engine(engine, label: str):
+    """Time every statement run on a SQLAlchemy (sync) engine."""
+    from sqlalchemy import event
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        DB_QUERY_LATENCY.observe(time.perf_counter() - conn.info["query_started"].pop(), engine=label)
+
+    def on_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    event.listen(engine, "handle_error", on_error)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request durations. Routes are
+    labelled by their path template (/trends/{keyword}) so the label set
+    stays bounded; unmatched paths and static files share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_LATENCY.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "other"),
+                status=status_code[0]
+            )
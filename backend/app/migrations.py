@@ -0,0 +1,45 @@
+import logging
+from sqlalchemy import inspect, text
+from .models import normalize_email
+
+logger = logging.getLogger(__name__)
+
+# Lightweight in-place migrations for columns added after a database was
+# created. create_all() only creates missing tables, so existing SQLite files
+# and Postgres databases get new columns here. Each step is idempotent.
+
+
+def _add_email_lower(conn):
+    columns = {column["name"] for column in inspect(conn).get_columns("users")}
+    if "email_lower" not in columns:
+        logger.info("Migrating users: adding email_lower")
+        conn.execute(text("ALTER TABLE users ADD COLUMN email_lower VARCHAR"))
+
+    # Backfill in Python: SQLite's lower() only folds ASCII, and lookups
+    # compare against normalize_email()
+    rows = conn.execute(text(
+        "SELECT id, email FROM users WHERE email_lower IS NULL AND email IS NOT NULL"
+    )).fetchall()
+    if rows:
+        conn.execute(
+            text("UPDATE users SET email_lower = :email_lower WHERE id = :id"),
+            [{"id": row.id, "email_lower": normalize_email(row.email)} for row in rows]
+        )
+        logger.info("Backfilled email_lower for %d users", len(rows))
+
+    index_names = {index["name"] for index in inspect(conn).get_indexes("users")}
+    if "ix_users_email_lower" in index_names:
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(text("CREATE UNIQUE INDEX ix_users_email_lower ON users (email_lower)"))
+    except Exception as e:
+        # Legacy rows that differ only in case: keep the lookup indexed, just not unique
+        logger.warning("email_lower has case-insensitive duplicates, creating a non-unique index: %s", e)
+        conn.execute(text("CREATE INDEX ix_users_email_lower ON users (email_lower)"))
+
+
+def run_migrations(engine):
+    """Bring an existing database up to the current models. Safe to run on every start."""
+    with engine.begin() as conn:
+        _add_email_lower(conn)
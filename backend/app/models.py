@@ -1,14 +1,40 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Date, UniqueConstraint
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 from .database import Base
 
+def normalize_email(email):
+    """Lookup form of an email address: trimmed and lowercased."""
+    return email.strip().lower() if email else email
+
+
 class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
+    # Normalized copy of email for indexed case-insensitive lookups (set from email)
+    email_lower = Column(String, unique=True, index=True)
     username = Column(String, unique=True, index=True)
     password_hash = Column(String)  # Hashed password
     full_name = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    last_login = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
+    last_login = Column(DateTime(timezone=True), nullable=True)
+
+    @validates("email")
+    def _sync_email_lower(self, key, email):
+        self.email_lower = normalize_email(email)
+        return email
+
+class TrendPoint(Base):
+    __tablename__ = "trend_points"
+    __table_args__ = (
+        UniqueConstraint("keyword", "geo", "date", name="uq_trend_points_keyword_geo_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    keyword = Column(String)  # query as sent to Google Trends, lowercased
+    geo = Column(String)
+    date = Column(Date)
+    value = Column(Integer)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
@@ -0,0 +1,492 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+from .. import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# How often the background sweeper drops expired entries (seconds)
+CACHE_SWEEP_INTERVAL = float(os.getenv('CACHE_SWEEP_INTERVAL', '60'))
+
+# Shared cache backend: "memory" (per process) or "redis" (shared by all
+# workers/replicas; any server speaking the Redis protocol works)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory').lower()
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+CACHE_REDIS_MAX_CONNECTIONS = int(os.getenv('CACHE_REDIS_MAX_CONNECTIONS', '10'))
+CACHE_REDIS_TIMEOUT = float(os.getenv('CACHE_REDIS_TIMEOUT', '1.0'))
+CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', '2know')
+
+# Every TTLCache registers here so one sweeper task covers all of them
+_caches = weakref.WeakSet()
+_sweeper_task = None
+# Other periodic cleanup run by the sweeper (async callables)
+_sweep_hooks = []
+
+# Backends created by create_cache_backend, closed on shutdown
+_backends = []
+# Cache name -> stats() callable, exported as hit ratio metrics
+_stats_sources = {}
+
+
+def _estimate_size(value):
+    """Approximate memory footprint of a cached value, in bytes."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with a per-entry TTL and LRU eviction.
+    Reads refresh an entry's recency; inserting past max_entries (or past the
+    approximate max_bytes budget, if set) evicts least recently used entries.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int = 0):
+        self.ttl = ttl
+        self.max_entries = max(int(max_entries), 1)
+        self.max_bytes = max(int(max_bytes), 0)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        _caches.add(self)
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, value = entry
+            if time.time() >= expires_at:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key):
+        """
+        Like get(), but leaves LRU order and hit/miss stats alone, for
+        internal reads (age probes, refresh bookkeeping) that aren't user traffic.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.time() >= entry[0]:
+                return None
+            return entry[2]
+
+    def set(self, key, value, ttl: float = None):
+        size = _estimate_size(value) if self.max_bytes else 0
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (expires_at, size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes and len(self._data) > 1):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        # Caller must hold the lock
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def sweep_expired(self):
+        """Drop every expired entry. Returns the number removed."""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (expires_at, _, _) in self._data.items() if now >= expires_at]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'approx_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class CacheBackend:
+    """
+    Async cache interface used by the trends and Serper services.
+    Values must be JSON-serializable so they can live out of process.
+    """
+
+    name = 'base'
+
+    async def get(self, key):
+        raise NotImplementedError
+
+    async def peek(self, key):
+        """Read without counting a hit/miss or refreshing recency."""
+        raise NotImplementedError
+
+    async def set(self, key, value, ttl: float = None):
+        raise NotImplementedError
+
+    async def delete(self, key):
+        raise NotImplementedError
+
+    def stats(self):
+        return {'backend': self.name}
+
+    async def close(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process backend: a bounded TTLCache."""
+
+    name = 'memory'
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int = 0):
+        self._cache = TTLCache(ttl=ttl, max_entries=max_entries, max_bytes=max_bytes)
+
+    async def get(self, key):
+        return self._cache.get(key)
+
+    async def peek(self, key):
+        return self._cache.peek(key)
+
+    async def set(self, key, value, ttl: float = None):
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key):
+        self._cache.delete(key)
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats['backend'] = self.name
+        return stats
+
+
+def _dumps(value):
+    """Compact serialization: minified JSON, zlib-compressed when large."""
+    raw = json.dumps(value, separators=(',', ':'), default=str).encode()
+    if len(raw) > 512:
+        return b'z' + zlib.compress(raw, 6)
+    return b'j' + raw
+
+
+def _loads(blob):
+    if blob[:1] == b'z':
+        return json.loads(zlib.decompress(blob[1:]))
+    if blob[:1] == b'j':
+        return json.loads(blob[1:])
+    raise ValueError(f"unknown cache value format {blob[:1]!r}")
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Networked backend speaking the Redis protocol (RESP) over asyncio streams.
+    Entries carry their TTL server-side (SET ... PX), so every worker and
+    replica pointing at the same server shares one copy of each result.
+    Connection errors degrade to cache misses rather than failing requests.
+    """
+
+    name = 'redis'
+
+    def __init__(self, namespace: str, ttl: float, url: str = CACHE_REDIS_URL,
+                 max_connections: int = CACHE_REDIS_MAX_CONNECTIONS, timeout: float = CACHE_REDIS_TIMEOUT):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.namespace = namespace
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_connections = max(int(max_connections), 1)
+        self._idle = []
+        self._slots = None
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.decode_errors = 0
+        self.bytes_written = 0
+
+    def _key(self, key):
+        return f"{CACHE_KEY_PREFIX}:{self.namespace}:{key}"
+
+    async def _connect(self):
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        conn = (reader, writer)
+        if self.password:
+            await self._send(conn, 'AUTH', self.password)
+        if self.db:
+            await self._send(conn, 'SELECT', str(self.db))
+        return conn
+
+    @staticmethod
+    def _encode(*args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(f"${len(arg)}\r\n".encode() + arg + b"\r\n")
+        return b"".join(parts)
+
+    async def _read_reply(self, reader):
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("cache server closed the connection")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b'+':
+            return body.decode()
+        if prefix == b'-':
+            raise RedisError(body.decode())
+        if prefix == b':':
+            return int(body)
+        if prefix == b'$':
+            length = int(body)
+            if length < 0:
+                return None
+            data = await reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b'*':
+            count = int(body)
+            if count < 0:
+                return None
+            return [await self._read_reply(reader) for _ in range(count)]
+        raise RedisError(f"unexpected reply: {line!r}")
+
+    async def _send(self, conn, *args):
+        reader, writer = conn
+        writer.write(self._encode(*args))
+        await writer.drain()
+        return await asyncio.wait_for(self._read_reply(reader), self.timeout)
+
+    async def _send_or_close(self, conn, *args):
+        try:
+            return await self._send(conn, *args)
+        except BaseException:
+            conn[1].close()
+            raise
+
+    async def _command(self, *args):
+        # Semaphore is created lazily so the backend can be built at import time
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        async with self._slots:
+            if not self._idle:
+                conn = await self._connect()
+                reply = await self._send_or_close(conn, *args)
+            else:
+                conn = self._idle.pop()
+                try:
+                    reply = await self._send_or_close(conn, *args)
+                except (OSError, EOFError) as e:
+                    # The server dropped the idle connection (restart, idle
+                    # timeout); the other idle ones are likely gone too.
+                    # Commands are idempotent, so retry once on a fresh one.
+                    logger.debug("Idle cache connection failed (%s); reconnecting", e)
+                    self.reconnects += 1
+                    await self.close()
+                    conn = await self._connect()
+                    reply = await self._send_or_close(conn, *args)
+            self._idle.append(conn)
+            return reply
+
+    async def _get(self, key, count: bool):
+        try:
+            blob = await self._command('GET', self._key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Cache backend GET failed: %s", e)
+            return None
+        if blob is None:
+            self.misses += count
+            return None
+        try:
+            value = _loads(blob)
+        except (ValueError, zlib.error) as e:
+            # Corrupt or written by something else: treat as a miss and drop it
+            logger.warning("Cache backend value for %s could not be decoded: %s", key, e)
+            self.decode_errors += 1
+            self.misses += count
+            await self.delete(key)
+            return None
+        self.hits += count
+        return value
+
+    async def get(self, key):
+        return await self._get(key, count=True)
+
+    async def peek(self, key):
+        # Kept out of the hit/miss stats (the server itself still updates
+        # the key's LRU clock on GET)
+        return await self._get(key, count=False)
+
+    async def set(self, key, value, ttl: float = None):
+        blob = _dumps(value)
+        ttl_ms = max(int((self.ttl if ttl is None else ttl) * 1000), 1)
+        try:
+            await self._command('SET', self._key(key), blob, 'PX', ttl_ms)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Cache backend SET failed: %s", e)
+            return
+        self.sets += 1
+        self.bytes_written += len(blob)
+
+    async def delete(self, key):
+        try:
+            await self._command('DEL', self._key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Cache backend DEL failed: %s", e)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.name,
+            'server': f"{self.host}:{self.port}/{self.db}",
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'sets': self.sets,
+            'errors': self.errors,
+            'reconnects': self.reconnects,
+            'decode_errors': self.decode_errors,
+            'bytes_written': self.bytes_written,
+            'idle_connections': len(self._idle)
+        }
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+def create_cache_backend(namespace: str, ttl: float, max_entries: int, max_bytes: int = 0):
+    """Build the cache backend selected by CACHE_BACKEND for one namespace."""
+    if CACHE_BACKEND == 'redis':
+        logger.info("Using shared cache backend for '%s' at %s", namespace, CACHE_REDIS_URL)
+        backend = RedisCacheBackend(namespace=namespace, ttl=ttl)
+    else:
+        if CACHE_BACKEND != 'memory':
+            logger.warning("Unknown CACHE_BACKEND '%s'. Using in-process memory cache.", CACHE_BACKEND)
+        backend = MemoryCacheBackend(ttl=ttl, max_entries=max_entries, max_bytes=max_bytes)
+    _backends.append(backend)
+    register_cache_stats(namespace, backend.stats)
+    return backend
+
+
+def register_cache_stats(name: str, stats):
+    """Export a cache's hits, misses and hit ratio on /metrics."""
+    _stats_sources[name] = stats
+
+
+def _collect_cache_stat(field):
+    def collect():
+        return [((name,), stats().get(field, 0)) for name, stats in list(_stats_sources.items())]
+    return collect
+
+
+metrics.register_callback('twoknow_cache_hits_total', 'counter', 'Cache lookups that found a live entry.',
+                          ('cache',), _collect_cache_stat('hits'))
+metrics.register_callback('twoknow_cache_misses_total', 'counter', 'Cache lookups that found nothing.',
+                          ('cache',), _collect_cache_stat('misses'))
+metrics.register_callback('twoknow_cache_hit_ratio', 'gauge', 'Hits / lookups since start.',
+                          ('cache',), _collect_cache_stat('hit_ratio'))
+
+
+async def close_cache_backends():
+    """Close network connections held by cache backends. Called on shutdown."""
+    for backend in _backends:
+        await backend.close()
+
+
+def register_sweep_hook(hook):
+    """
+    Run an async callable on every sweep, for stores that outgrow the
+    in-memory caches (e.g. the trend store). Hooks pace themselves.
+    """
+    _sweep_hooks.append(hook)
+
+
+async def _sweep_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        for cache in list(_caches):
+            removed = cache.sweep_expired()
+            if removed:
+                logger.debug("Swept %d expired cache entries", removed)
+        for hook in list(_sweep_hooks):
+            try:
+                await hook()
+            except Exception as e:
+                logger.warning("Sweep hook %s failed: %s", getattr(hook, '__qualname__', hook), e)
+
+
+def start_sweeper(interval: float = CACHE_SWEEP_INTERVAL):
+    """Start the background expiry sweeper. Called from the FastAPI lifespan."""
+    global _sweeper_task
+    if _sweeper_task is None or _sweeper_task.done():
+        _sweeper_task = asyncio.create_task(_sweep_loop(interval))
+    return _sweeper_task
+
+
+async def stop_sweeper():
+    global _sweeper_task
+    if _sweeper_task is not None:
+        _sweeper_task.cancel()
+        try:
+            await _sweeper_task
+        except asyncio.CancelledError:
+            pass
+    _sweeper_task = None
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import time
+from dotenv import load_dotenv
+from . import google_trends_service
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Popularity tracking: each request adds 1 to a counter that halves every
+# WARMER_HALF_LIFE seconds, so the ranking follows current traffic.
+WARMER_ENABLED = os.getenv('WARMER_ENABLED', 'true').lower() == 'true'
+WARMER_HALF_LIFE = float(os.getenv('WARMER_HALF_LIFE', '3600'))  # seconds
+WARMER_MAX_TRACKED = int(os.getenv('WARMER_MAX_TRACKED', '10000'))
+
+# Scheduler: every WARMER_INTERVAL seconds, refresh the WARMER_TOP_N most
+# popular keyword/region pairs whose cache entry is missing or will expire
+# within WARMER_LEAD_TIME seconds.
+WARMER_INTERVAL = float(os.getenv('WARMER_INTERVAL', '60'))
+WARMER_TOP_N = int(os.getenv('WARMER_TOP_N', '200'))
+WARMER_LEAD_TIME = float(os.getenv('WARMER_LEAD_TIME', '120'))
+# Share of the Google Trends rate budget the warmer may spend per cycle;
+# the rest is left for user requests.
+WARMER_BUDGET_SHARE = float(os.getenv('WARMER_BUDGET_SHARE', '0.5'))
+
+# (keyword lower, region) -> [score, last update time, keyword as requested]
+_popularity = {}
+_warmer_task = None
+
+_stats = {
+    'cycles': 0,
+    'refreshed': 0,
+    'skipped_budget': 0,
+    'skipped_circuit': 0,
+    'failed': 0,
+    'last_cycle_seconds': 0.0
+}
+
+
+def _decayed(score: float, updated: float, now: float):
+    return score * 0.5 ** ((now - updated) / WARMER_HALF_LIFE)
+
+
+def record_request(keyword: str, region: str = "KE"):
+    """Count one request for a keyword/region pair."""
+    if not keyword or not keyword.strip():
+        return
+    now = time.time()
+    key = (keyword.strip().lower(), region)
+    entry = _popularity.get(key)
+    if entry is None:
+        _popularity[key] = [1.0, now, keyword.strip()]
+        if len(_popularity) > WARMER_MAX_TRACKED:
+            _prune(now)
+    else:
+        entry[0] = _decayed(entry[0], entry[1], now) + 1.0
+        entry[1] = now
+
+
+def _prune(now: float):
+    # Drop the least popular half so one-off keywords don't accumulate
+    ranked = sorted(_popularity.items(), key=lambda item: _decayed(item[1][0], item[1][1], now))
+    for key, _ in ranked[:len(ranked) // 2]:
+        del _popularity[key]
+
+
+def top_keywords(n: int = WARMER_TOP_N):
+    """Most popular (keyword, region, score) tuples right now."""
+    now = time.time()
+    ranked = sorted(
+        ((entry[2], key[1], _decayed(entry[0], entry[1], now)) for key, entry in _popularity.items()),
+        key=lambda item: item[2],
+        reverse=True
+    )
+    return ranked[:n]
+
+
+async def warm_once():
+    """Run one warming cycle. Returns the number of entries refreshed."""
+    started = time.time()
+    budget = max(int(google_trends_service.TRENDS_QPS * WARMER_INTERVAL * WARMER_BUDGET_SHARE), 1)
+    refresh_before = max(google_trends_service.CACHE_TTL - WARMER_LEAD_TIME, 0)
+    refreshed = 0
+
+    for keyword, region, _ in top_keywords():
+        if refreshed >= budget:
+            break
+        age = await google_trends_service.get_cache_age(keyword, region=region)
+        if age is not None and age < refresh_before:
+            continue
+        # Leave headroom for user requests: only refresh while tokens are spare
+        if google_trends_service.rate_budget_available() < 1:
+            _stats['skipped_budget'] += 1
+            break
+        # No point refreshing while Google Trends calls are being refused
+        if google_trends_service.circuit_open():
+            _stats['skipped_circuit'] += 1
+            break
+        try:
+            # None: the upstream fetch failed and the cached entry was kept
+            if await google_trends_service.refresh_historical_trends(keyword, region=region) is None:
+                _stats['failed'] += 1
+            else:
+                refreshed += 1
+        except Exception as e:
+            logger.warning("Cache warmer failed for %s in %s: %s", keyword, region, e)
+
+    _stats['cycles'] += 1
+    _stats['refreshed'] += refreshed
+    _stats['last_cycle_seconds'] = round(time.time() - started, 3)
+    if refreshed:
+        logger.info("Cache warmer refreshed %d popular trend entries", refreshed)
+    return refreshed
+
+
+async def _warm_loop():
+    while True:
+        await asyncio.sleep(WARMER_INTERVAL)
+        try:
+            await warm_once()
+        except Exception as e:
+            logger.exception("Cache warmer cycle failed: %s", e)
+
+
+def start_warmer():
+    """Start the background warmer. Called from the FastAPI lifespan."""
+    global _warmer_task
+    if not WARMER_ENABLED or google_trends_service.USE_DEMO_DATA:
+        return None
+    if _warmer_task is None or _warmer_task.done():
+        _warmer_task = asyncio.create_task(_warm_loop())
+        logger.info("Cache warmer started (top %d every %.0fs)", WARMER_TOP_N, WARMER_INTERVAL)
+    return _warmer_task
+
+
+async def stop_warmer():
+    global _warmer_task
+    if _warmer_task is not None:
+        _warmer_task.cancel()
+        try:
+            await _warmer_task
+        except asyncio.CancelledError:
+            pass
+    _warmer_task = None
+
+
+def get_warmer_stats():
+    stats = dict(_stats)
+    stats['running'] = _warmer_task is not None and not _warmer_task.done()
+    stats['tracked_keys'] = len(_popularity)
+    stats['top'] = [
+        {"keyword": keyword, "region": region, "score": round(score, 2)}
+        for keyword, region, score in top_keywords(10)
+    ]
+    return stats
@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+from .. import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Numeric values for the state gauge on /metrics
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_breakers = {}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-upstream circuit breaker.
+
+    Closed: calls go through. Failures and rate-limit responses since the
+    last success are counted; reaching `failure_threshold` failures or
+    `rate_limit_threshold` rate limits opens the circuit.
+    Open: allow() refuses every call for `open_seconds`, so callers fall
+    back to cached or demo data immediately instead of retrying.
+    Half-open: after the open period one probe call is let through. Success
+    closes the circuit; failure reopens it for twice as long (up to
+    `max_open_seconds`), so a ban is not prolonged by steady probing.
+
+    Outcomes are recorded from worker threads as well as the event loop,
+    hence the lock. A threshold of 0 disables that trigger.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, rate_limit_threshold: int,
+                 open_seconds: float, max_open_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.rate_limit_threshold = rate_limit_threshold
+        self.base_open_seconds = max(float(open_seconds), 0.1)
+        self.max_open_seconds = max(float(max_open_seconds), self.base_open_seconds)
+        self.open_seconds = self.base_open_seconds
+        self.state = CLOSED
+        self._failures = 0
+        self._rate_limits = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+        self._stats = {'opened': 0, 'rejected': 0, 'probes': 0}
+        _breakers[name] = self
+
+    def _retry_at(self):
+        return self._opened_at + self.open_seconds
+
+    def is_open(self):
+        """True while calls would be refused (open and not yet due for a probe)."""
+        with self._lock:
+            return self.state == OPEN and time.monotonic() < self._retry_at()
+
+    def refuse_early(self):
+        """
+        True if allow() would refuse a call right now (counted as rejected),
+        without claiming the half-open probe. Lets callers bail out before
+        spending a rate limiter token on a call that can't go out.
+        """
+        with self._lock:
+            now = time.monotonic()
+            refused = (
+                (self.state == OPEN and now < self._retry_at())
+                or (self.state == HALF_OPEN and self._probe_started is not None
+                    and now - self._probe_started < self.open_seconds)
+            )
+            if refused:
+                self._stats['rejected'] += 1
+            return refused
+
+    def allow(self):
+        """
+        Whether a call may go to the upstream now. In half-open state only
+        one probe is allowed at a time; its outcome must be recorded.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now >= self._retry_at():
+                self.state = HALF_OPEN
+                self._probe_started = None
+                logger.info("Circuit for %s is half-open; probing upstream", self.name)
+            # A probe that never reported back (cancelled) is given up on
+            # after one open period so the circuit can't get stuck half-open
+            if self.state == HALF_OPEN and (self._probe_started is None or now - self._probe_started >= self.open_seconds):
+                self._probe_started = now
+                self._stats['probes'] += 1
+                return True
+            self._stats['rejected'] += 1
+            return False
+
+    def record(self, outcome: str):
+        """Record a call's outcome: 'ok', 'error' or 'rate_limited' (the upstream metric labels)."""
+        with self._lock:
+            if outcome == 'ok':
+                if self.state != CLOSED:
+                    logger.info("Circuit for %s closed after a successful probe", self.name)
+                self.state = CLOSED
+                self.open_seconds = self.base_open_seconds
+                self._failures = 0
+                self._rate_limits = 0
+                self._probe_started = None
+                return
+
+            self._failures += 1
+            if outcome == 'rate_limited':
+                self._rate_limits += 1
+            if self.state == HALF_OPEN:
+                self.open_seconds = min(self.open_seconds * 2, self.max_open_seconds)
+                self._open(f"probe failed ({outcome})")
+            elif self.state == CLOSED and (
+                (self.failure_threshold > 0 and self._failures >= self.failure_threshold)
+                or (self.rate_limit_threshold > 0 and self._rate_limits >= self.rate_limit_threshold)
+            ):
+                self._open(f"{self._failures} failures, {self._rate_limits} rate limited")
+
+    def _open(self, reason: str):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_started = None
+        self._stats['opened'] += 1
+        logger.warning("Circuit for %s opened for %.1fs: %s", self.name, self.open_seconds, reason)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'state': self.state,
+                'consecutive_failures': self._failures,
+                'consecutive_rate_limits': self._rate_limits,
+                'open_seconds': self.open_seconds,
+                **self._stats
+            }
+            if self.state == OPEN:
+                stats['retry_in_seconds'] = round(max(self._retry_at() - time.monotonic(), 0.0), 1)
+            return stats
+
+
+def _collect_breaker_stat(field):
+    def collect():
+        return [((name,), breaker.stats()[field]) for name, breaker in list(_breakers.items())]
+    return collect
+
+
+metrics.register_callback(
+    'twoknow_circuit_state', 'gauge',
+    'Upstream circuit breaker state (0 closed, 1 half-open, 2 open).',
+    ('upstream',), lambda: [((name,), _STATE_VALUES[breaker.stats()['state']]) for name, breaker in list(_breakers.items())]
+)
+metrics.register_callback('twoknow_circuit_opened_total', 'counter', 'Times the circuit opened.',
+                          ('upstream',), _collect_breaker_stat('opened'))
+metrics.register_callback('twoknow_circuit_rejected_total', 'counter', 'Upstream calls refused by an open circuit.',
+                          ('upstream',), _collect_breaker_stat('rejected'))
@@ -1,167 +1,671 @@
+import logging
 import os
 from pytrends.request import TrendReq
 from datetime import datetime, timedelta
 import pandas as pd
 import time
 import random
+import asyncio
 from dotenv import load_dotenv
+from .. import metrics, tracing
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Check if we should use demo data
 USE_DEMO_DATA = not os.getenv("SERPER_API_KEY") or os.getenv("SERPER_API_KEY") == "not-set-yet"
 
-# Initialize pytrends only if we have real API access
-if not USE_DEMO_DATA:
-    pytrends = TrendReq(hl='en-US', tz=360, timeout=(10,25), retries=2)
-
-# Simple in-memory cache to reduce frequent Google Trends calls
+# pytrends keeps per-request state (build_payload -> interest_over_time), so
+# each worker thread gets its own client instead of sharing one module global.
 import threading
+_pytrends_local = threading.local()
+
+
+def _get_pytrends():
+    client = getattr(_pytrends_local, 'client', None)
+    if client is None:
+        client = TrendReq(hl='en-US', tz=360, timeout=(10,25), retries=2)
+        _pytrends_local.client = client
+    return client
+
+# Bounded in-memory cache to reduce frequent Google Trends calls
+from .cache import create_cache_backend
 CACHE_TTL = int(os.getenv('TRENDS_CACHE_TTL', '600'))  # seconds, default 10 minutes
-_trends_cache = {}
+CACHE_MAX_ENTRIES = int(os.getenv('TRENDS_CACHE_MAX_ENTRIES', '5000'))
+CACHE_MAX_BYTES = int(os.getenv('TRENDS_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))  # approximate, default 32 MB
+
+# Stale-while-revalidate: entries older than CACHE_TTL but younger than
+# STALE_MAX_AGE are served immediately while one background refresh runs.
+# Set TRENDS_STALE_MAX_AGE to TRENDS_CACHE_TTL (or lower) to disable.
+STALE_MAX_AGE = max(int(os.getenv('TRENDS_STALE_MAX_AGE', '3600')), CACHE_TTL)  # seconds, default 1 hour
+_trends_cache = create_cache_backend('trends', ttl=STALE_MAX_AGE, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES)
 _cache_lock = threading.Lock()
 
 # Simple metrics for monitoring
 _metrics = {
     'cache_hits': 0,
     'cache_misses': 0,
+    'stale_hits': 0,
+    'fallback_hits': 0,
+    'background_refreshes': 0,
+    'warm_refreshes': 0,
+    'store_hits': 0,
+    'store_incremental_fetches': 0,
+    'store_backoff_hits': 0,
+    'store_full_fetches': 0,
     'retries': 0,
     'rate_limit_hits': 0,
     'fallbacks': 0,
+    'circuit_fallbacks': 0,
+    'rate_wait_fallbacks': 0,
+    'failed_refreshes_kept': 0,
     'regional_queries': 0,
-    'regional_success': 0
+    'regional_success': 0,
+    'inflight_leaders': 0,
+    'inflight_joins': 0,
+    'upstream_payloads': 0,
+    'batched_keywords': 0,
+    'solo_refetches': 0
 }
 
+# In-flight upstream fetches keyed by cache key (single-flight coalescing).
+# Only touched from the event loop, so no lock is needed.
+_inflight = {}
+
 # Retry / backoff settings
 MAX_RETRIES = int(os.getenv('TRENDS_MAX_RETRIES', '3'))
 BACKOFF_BASE = float(os.getenv('TRENDS_BACKOFF_BASE', '1.0'))
 
+# Process-wide rate limit for Google Trends calls (shared by all requests)
+from .rate_limiter import TokenBucket, RateLimitWaitExceeded
+from . import trend_store
+# After a failed or empty incremental refresh, serve the stored series for
+# this long without asking upstream again (seconds)
+TRENDS_STORE_RETRY_BACKOFF = float(os.getenv('TRENDS_STORE_RETRY_BACKOFF', '300'))
+# (query, geo) -> monotonic time before which no incremental refresh is tried
+_store_retry_after = {}
+TRENDS_QPS = float(os.getenv('TRENDS_QPS', '0.5'))
+TRENDS_BURST = int(os.getenv('TRENDS_BURST', '3'))
+# Longest a fetch may queue for a token. Large batch/comparison requests can
+# queue hundreds of fetches; past this, callers fall back to cached or demo
+# data straight away instead of hanging behind them. 0 waits indefinitely.
+TRENDS_RATE_MAX_WAIT = float(os.getenv('TRENDS_RATE_MAX_WAIT', '10'))
+_rate_limiter = TokenBucket(rate=TRENDS_QPS, burst=TRENDS_BURST, max_wait=TRENDS_RATE_MAX_WAIT)
 
-def _get_cached(key):
-    with _cache_lock:
-        entry = _trends_cache.get(key)
-        if not entry:
+# Circuit breaker: after repeated failures or 429s, stop calling Google for a
+# while and fall back straight away instead of retrying with backoff (which
+# only adds latency and prolongs a ban). 0 disables a trigger.
+from .circuit_breaker import CLOSED, CircuitBreaker, CircuitOpenError
+TRENDS_CIRCUIT_FAILURES = int(os.getenv('TRENDS_CIRCUIT_FAILURES', '5'))
+TRENDS_CIRCUIT_RATE_LIMITS = int(os.getenv('TRENDS_CIRCUIT_RATE_LIMITS', '2'))
+TRENDS_CIRCUIT_OPEN_SECONDS = float(os.getenv('TRENDS_CIRCUIT_OPEN_SECONDS', '60'))
+TRENDS_CIRCUIT_MAX_OPEN_SECONDS = float(os.getenv('TRENDS_CIRCUIT_MAX_OPEN_SECONDS', '900'))
+_circuit = CircuitBreaker(
+    'pytrends',
+    failure_threshold=TRENDS_CIRCUIT_FAILURES,
+    rate_limit_threshold=TRENDS_CIRCUIT_RATE_LIMITS,
+    open_seconds=TRENDS_CIRCUIT_OPEN_SECONDS,
+    max_open_seconds=TRENDS_CIRCUIT_MAX_OPEN_SECONDS
+)
+
+# Micro-batching: cache misses arriving within this window for the same geo
+# and timeframe share one pytrends payload (Google allows 5 keywords each).
+# Set to 0 to send one keyword per payload.
+TRENDS_BATCH_WINDOW_MS = float(os.getenv('TRENDS_BATCH_WINDOW_MS', '50'))
+TRENDS_BATCH_SIZE = 5
+# A keyword whose peak in a shared payload is below this (on Google's 0-100
+# scale) was crushed by a more popular neighbour; its column is mostly
+# rounding noise, so it is re-fetched in a payload of its own instead
+TRENDS_BATCH_MIN_PEAK = float(os.getenv('TRENDS_BATCH_MIN_PEAK', '20'))
+_pending_batches = {}
+# Running batch and solo re-fetch tasks. The event loop only keeps weak
+# references to tasks, so these are held here until they finish.
+_batch_tasks = set()
+
+
+def _spawn_batch_task(coro):
+    # Shared by several requests, so traced on its own
+    task = asyncio.ensure_future(tracing.detached(coro, "trends batch"))
+    _batch_tasks.add(task)
+    task.add_done_callback(_batch_tasks.discard)
+    return task
+
+
+async def _get_cached(key):
+    """
+    Return (data, age_seconds, is_fallback) for a cached entry, or
+    (None, None, False).
+    """
+    entry = await _trends_cache.get(key)
+    if entry is None:
+        with _cache_lock:
             _metrics['cache_misses'] += 1
-            return None
-        ts, data = entry
-        if (time.time() - ts) < CACHE_TTL:
-            print(f"🔁 Serving cached trends for {key}")
+        return None, None, False
+    age = max(time.time() - entry['ts'], 0.0)
+    fallback = entry.get('fallback', False)
+    with _cache_lock:
+        if fallback:
+            _metrics['fallback_hits'] += 1
+        elif age < CACHE_TTL:
             _metrics['cache_hits'] += 1
-            return data
-        # expired
-        del _trends_cache[key]
-        _metrics['cache_misses'] += 1
+        else:
+            _metrics['stale_hits'] += 1
+    logger.debug("Serving cached trends for %s", key)
+    return entry['data'], age, fallback
+
+
+async def _set_cached(key, data, fallback: bool = False):
+    # Store the write time so readers can tell fresh from stale, and mark
+    # demo data standing in for a failed fetch so it is never kept as real
+    entry = {'ts': time.time(), 'data': data}
+    if fallback:
+        entry['fallback'] = True
+    await _trends_cache.set(key, entry)
+
+
+async def _kept_on_failure(key):
+    """
+    Data already cached for a key whose refresh just failed, or None on a
+    cold miss. A failed refresh keeps the existing entry (and its write
+    time, so it stays stale and is retried) rather than replacing real
+    data with a fallback. A cached fallback is not kept.
+    """
+    entry = await _trends_cache.peek(key)
+    if entry is None or entry.get('fallback'):
         return None
+    with _cache_lock:
+        _metrics['failed_refreshes_kept'] += 1
+    logger.warning("Trends refresh failed for %s; keeping the cached entry", key)
+    return entry['data']
+
+
+def _cache_key(keyword: str, region: str, timeframe: str):
+    # Cache key includes region and an indicator that we may bias by region
+    return f"{keyword.lower()}::{region}::{timeframe}::rb"
 
 
-def _set_cached(key, data):
+def _start_fetch(keyword: str, country: str, region: str, timeframe: str, cache_key: str):
+    """Start the upstream fetch for a key and register it as in flight."""
     with _cache_lock:
-        _trends_cache[key] = (time.time(), data)
+        _metrics['inflight_leaders'] += 1
+    # Joined by other requests (or run in the background), so it is traced
+    # on its own rather than inside the request that happened to start it
+    future = asyncio.ensure_future(tracing.detached(
+        _fetch_historical_trends(keyword, country, region, timeframe, cache_key), "trends fetch"
+    ))
+    _inflight[cache_key] = future
+    future.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+    return future
 
 
-def get_historical_trends(keyword: str, country: str = "KE", region: str = "KE", timeframe: str = "today 12-m"):
+def _log_refresh_result(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Background trends refresh failed: %s", future.exception())
+
+
+async def get_historical_trends(keyword: str, country: str = "KE", region: str = "KE", timeframe: str = "today 12-m"):
     """
     Fetch historical Google Trends data for a specific region.
-    Uses caching and exponential backoff retries to handle 429s and transient errors.
-    Returns demo data if API keys not set or if retries fail.
+    Concurrent cache misses for the same key share a single upstream fetch:
+    the first caller runs it and every other caller awaits its result.
+    """
+    data, _ = await get_historical_trends_with_status(keyword, country=country, region=region, timeframe=timeframe)
+    return data
+
+
+async def get_historical_trends_with_status(keyword: str, country: str = "KE", region: str = "KE", timeframe: str = "today 12-m"):
+    """
+    Same as get_historical_trends, but also reports how the data was served:
+    "fresh" (cached, within TTL), "stale" (cached past TTL, or kept because
+    this request's refresh failed), "refreshed" (fetched from upstream for
+    this request), "fallback" (demo data standing in for a failed fetch) or
+    "demo" (demo mode, no upstream configured).
     """
     if USE_DEMO_DATA:
-        print(f"📊 Using demo historical data for: {keyword} in {region}")
-        return generate_demo_historical_data(keyword, region=region)
+        logger.debug("Using demo historical data for: %s in %s", keyword, region)
+        return generate_demo_historical_data(keyword, region=region), "demo"
 
-    # Cache key includes region and an indicator that we may bias by region
-    cache_key = f"{keyword.lower()}::{region}::{timeframe}::rb"
-    cached = _get_cached(cache_key)
+    cache_key = _cache_key(keyword, region, timeframe)
+    with tracing.span("trends_cache"):
+        cached, age, fallback = await _get_cached(cache_key)
+    if fallback:
+        # A cached fallback only stands in until the TTL; then it is
+        # fetched again like a miss rather than served as stale real data
+        if age < CACHE_TTL:
+            return cached, "fallback"
+        cached = None
     if cached is not None:
-        return cached
+        if age < CACHE_TTL:
+            return cached, "fresh"
+        # Stale but within the max age: serve it now, refresh in the background
+        # (unless the circuit is open; the stale copy beats a fallback)
+        if cache_key not in _inflight and not _circuit.is_open():
+            with _cache_lock:
+                _metrics['background_refreshes'] += 1
+            logger.debug("Refreshing stale trends in background for %s", cache_key)
+            _start_fetch(keyword, country, region, timeframe, cache_key).add_done_callback(_log_refresh_result)
+        return cached, "stale"
+
+    future = _inflight.get(cache_key)
+    if future is not None:
+        with _cache_lock:
+            _metrics['inflight_joins'] += 1
+        logger.debug("Joining in-flight trends fetch for %s", cache_key)
+        # shield so one cancelled waiter does not cancel the shared fetch
+        with tracing.span("trends_fetch"):
+            return await asyncio.shield(future)
+
+    with tracing.span("trends_fetch"):
+        future = _start_fetch(keyword, country, region, timeframe, cache_key)
+        return await asyncio.shield(future)
+
+
+async def refresh_historical_trends(keyword: str, country: str = "KE", region: str = "KE", timeframe: str = "today 12-m"):
+    """
+    Fetch a key from upstream now and replace its cache entry, even if the
+    cached copy is still fresh (used by the cache warmer). Joins a fetch
+    already in flight for the same key.
+    If the fetch fails, the cached entry is left as it was (never replaced
+    by demo data) and None is returned.
+    """
+    if USE_DEMO_DATA:
+        return None
+    cache_key = _cache_key(keyword, region, timeframe)
+    future = _inflight.get(cache_key)
+    if future is None:
+        with _cache_lock:
+            _metrics['warm_refreshes'] += 1
+        future = _start_fetch(keyword, country, region, timeframe, cache_key)
+    data, status = await asyncio.shield(future)
+    return data if status == "refreshed" else None
+
+
+async def get_cache_age(keyword: str, region: str = "KE", timeframe: str = "today 12-m"):
+    """Age in seconds of the cached entry for a key, or None if it isn't cached."""
+    entry = await _trends_cache.peek(_cache_key(keyword, region, timeframe))
+    if entry is None:
+        return None
+    return max(time.time() - entry['ts'], 0.0)
+
+
+def rate_budget_available():
+    """Google Trends tokens currently available in the shared rate limiter."""
+    return _rate_limiter.stats()['tokens_available']
+
+
+def circuit_open():
+    """True while the Google Trends circuit breaker is refusing calls."""
+    return _circuit.is_open()
+
+
+def _is_rate_limit_error(e):
+    err_msg = str(e).lower()
+    return '429' in err_msg or 'too many' in err_msg or 'responseerror' in err_msg
+
+
+def _query_interest_over_time(keywords: list, timeframe: str, country: str):
+    """Blocking pytrends round trip for up to 5 keywords (run in a worker thread)."""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        client = _get_pytrends()
+        client.build_payload(keywords, cat=0, timeframe=timeframe, geo=country, gprop='')
+        df = client.interest_over_time()
+        outcome = 'ok'
+        return df
+    except Exception as e:
+        if _is_rate_limit_error(e):
+            outcome = 'rate_limited'
+        raise
+    finally:
+        metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - started, upstream='pytrends', outcome=outcome)
+        _circuit.record(outcome)
+
+
+async def _acquire_token():
+    """
+    Wait for a rate limiter token, unless the circuit would refuse the call:
+    a refused call must not spend a token (or queue for one) that a caller
+    let through could use.
+    """
+    if _circuit.refuse_early():
+        raise CircuitOpenError("Google Trends circuit is open")
+    await _rate_limiter.acquire()
+    # Checked again after the wait, so calls queued before the circuit
+    # opened don't go out anyway. allow() also claims the half-open probe.
+    if not _circuit.allow():
+        raise CircuitOpenError("Google Trends circuit is open")
+
+
+def _split_column(df, kv: str, shared: bool):
+    """
+    Pull one keyword's column out of a (possibly multi-keyword) frame.
+    Google scales every keyword in a payload against the payload's overall
+    peak, so each column of a shared payload is rescaled to its own peak of
+    100 to keep results comparable with single-keyword requests.
+    An empty frame (Google had no data for any keyword in the payload) or a
+    missing column gives an empty result, as a solo request would.
+    Returns None when a shared payload left the keyword below
+    TRENDS_BATCH_MIN_PEAK (including all zeros): rescaling that would turn
+    noise into data, so the caller re-fetches it on its own.
+    """
+    if df.empty or kv not in df.columns:
+        return pd.DataFrame()
+    column = df[kv].astype(float)
+    if not shared:
+        return column.to_frame(kv)
+    peak = column.max()
+    if not peak >= TRENDS_BATCH_MIN_PEAK:
+        return None
+    return (column * 100.0 / peak).round().to_frame(kv)
 
-    # Build a list of keyword variants to try (prefer region-biased query when a region is selected)
-    keyword_variants = []
+
+async def _query_solo(kv: str, timeframe: str, country: str):
+    """One rate-limited payload for a single keyword."""
+    await _acquire_token()
+    with _cache_lock:
+        _metrics['upstream_payloads'] += 1
+        _metrics['batched_keywords'] += 1
+    return await asyncio.to_thread(_query_interest_over_time, [kv], timeframe, country)
+
+
+async def _refetch_solo(kv: str, futures: list, timeframe: str, country: str):
+    with _cache_lock:
+        _metrics['solo_refetches'] += 1
+    try:
+        df = await _query_solo(kv, timeframe, country)
+    except Exception as e:
+        for future in futures:
+            if not future.done():
+                future.set_exception(e)
+        return
+    result = _split_column(df, kv, shared=False)
+    for future in futures:
+        if not future.done():
+            future.set_result(result)
+
+
+async def _run_batch(keywords: list, waiters: list, timeframe: str, country: str):
+    try:
+        await _acquire_token()
+        with _cache_lock:
+            _metrics['upstream_payloads'] += 1
+            _metrics['batched_keywords'] += len(keywords)
+        df = await asyncio.to_thread(_query_interest_over_time, keywords, timeframe, country)
+    except Exception as e:
+        for _, future in waiters:
+            if not future.done():
+                future.set_exception(e)
+        return
+    shared = len(keywords) > 1
+    refetch = {}
+    for kv, future in waiters:
+        if future.done():
+            continue
+        column = _split_column(df, kv, shared)
+        if column is None:
+            refetch.setdefault(kv, []).append(future)
+        else:
+            future.set_result(column)
+    for kv, futures in refetch.items():
+        logger.debug("'%s' peaked below %s in a shared payload; re-fetching it alone", kv, TRENDS_BATCH_MIN_PEAK)
+        _spawn_batch_task(_refetch_solo(kv, futures, timeframe, country))
+
+
+def _flush_batch(group_key):
+    pending = _pending_batches.pop(group_key, None)
+    if not pending:
+        return
+    waiters, timer = pending
+    timer.cancel()
+    country, timeframe = group_key
+    # The same variant can be queued twice (e.g. different regions falling
+    # back to the plain keyword); it only needs one column in the payload.
+    keywords = list(dict.fromkeys(kv for kv, _ in waiters))
+    for i in range(0, len(keywords), TRENDS_BATCH_SIZE):
+        chunk = keywords[i:i + TRENDS_BATCH_SIZE]
+        chunk_waiters = [(kv, f) for kv, f in waiters if kv in chunk]
+        _spawn_batch_task(_run_batch(chunk, chunk_waiters, timeframe, country))
+
+
+async def _interest_over_time(kv: str, timeframe: str, country: str):
+    """
+    Fetch the interest_over_time frame for one keyword. Requests for the same
+    geo and timeframe made within TRENDS_BATCH_WINDOW_MS are packed into
+    shared payloads of up to five keywords.
+    """
+    if TRENDS_BATCH_WINDOW_MS <= 0:
+        return await _query_solo(kv, timeframe, country)
+
+    loop = asyncio.get_running_loop()
+    group_key = (country, timeframe)
+    future = loop.create_future()
+    pending = _pending_batches.get(group_key)
+    if pending is None:
+        timer = loop.call_later(TRENDS_BATCH_WINDOW_MS / 1000.0, _flush_batch, group_key)
+        pending = _pending_batches[group_key] = ([], timer)
+    waiters = pending[0]
+    waiters.append((kv, future))
+    if len({k for k, _ in waiters}) >= TRENDS_BATCH_SIZE:
+        _flush_batch(group_key)
+    return await future
+
+
+async def _fetch_historical_trends(keyword: str, country: str, region: str, timeframe: str, cache_key: str):
+    """
+    Run the upstream Google Trends fetch for one cache key.
+    For a region, a region-biased query is tried first; if it yields nothing
+    the region falls back to the country-level series, which is fetched (and
+    cached) once and shared by every region.
+    If retries fail, an entry already in the cache (a stale or warmer
+    refresh) is kept and returned; only a cold miss falls back to demo data.
+    Returns (data, status) with the statuses of
+    get_historical_trends_with_status.
+    """
     if region and region != 'KE':
         # Try a query that includes the region to bias results (works where geo codes are limited)
-        keyword_variants.append(f"{keyword} {region} Kenya")
-    # Always try the plain keyword as fallback
-    keyword_variants.append(keyword)
+        kv = f"{keyword} {region} Kenya"
+        with _cache_lock:
+            _metrics['regional_queries'] += 1
+        regional = await _fetch_stored_series(kv, keyword, country, region, timeframe, retry_empty=False)
+        if regional:
+            with _cache_lock:
+                _metrics['regional_success'] += 1
+            await _set_cached(cache_key, regional)
+            return regional, "refreshed"
+        if regional is None:
+            # The regional query failed (errors, circuit open, rate limiter
+            # refusal). When refreshing an existing entry, the country-level
+            # series may itself be a fallback, so keep what is cached.
+            # An empty regional result is a real answer and falls through.
+            kept = await _kept_on_failure(cache_key)
+            if kept is not None:
+                return kept, "stale"
+        country_level, status = await get_historical_trends_with_status(keyword, country=country, region='KE', timeframe=timeframe)
+        # Cache under the region key too, so the empty regional query isn't re-run on every request
+        # (but not a circuit-breaker or rate-limit fallback, which must not outlive the overload)
+        if _circuit.state == CLOSED and not _rate_limiter.backlogged():
+            await _set_cached(cache_key, country_level, fallback=status == "fallback")
+        return country_level, "refreshed" if status == "fresh" else status
+
+    final = await _fetch_stored_series(keyword, keyword, country, region, timeframe)
+    if final:
+        await _set_cached(cache_key, final)
+        return final, "refreshed"
+
+    kept = await _kept_on_failure(cache_key)
+    if kept is not None:
+        return kept, "stale"
+
+    result = generate_demo_historical_data(keyword, region=region)
+    if _circuit.state != CLOSED:
+        # Not cached: real data should be served as soon as the circuit closes
+        logger.debug("Google Trends circuit open; returning demo data for '%s' in %s", keyword, region)
+        with _cache_lock:
+            _metrics['circuit_fallbacks'] += 1
+        return result, "fallback"
+    if _rate_limiter.backlogged():
+        # Same for a fetch that gave up on the rate limiter queue
+        logger.debug("Google Trends rate limiter backlogged; returning demo data for '%s' in %s", keyword, region)
+        with _cache_lock:
+            _metrics['rate_wait_fallbacks'] += 1
+        return result, "fallback"
+
+    # All retries failed on a cold miss - return (and cache) demo data
+    logger.error("Google Trends failed after %d attempts for '%s' in %s. Returning demo data.", MAX_RETRIES, keyword, region)
+    with _cache_lock:
+        _metrics['fallbacks'] += 1
+    await _set_cached(cache_key, result, fallback=True)
+    return result, "fallback"
+
+
+def _frame_to_series(df, kv: str, keyword: str):
+    """
+    Convert an interest_over_time frame to [{"date", "value"}] points.
+    Works column-wise: picks the value column once, drops null and
+    non-positive values with a mask, and formats all dates in one call.
+    """
+    if df.empty:
+        return []
+
+    # use kv as column if present, otherwise keyword, otherwise the first value column
+    if kv in df.columns:
+        col_name = kv
+    elif keyword in df.columns:
+        col_name = keyword
+    else:
+        cols = [c for c in df.columns if c not in ('date', 'isPartial')]
+        if not cols:
+            return []
+        col_name = cols[0]
 
-    # Try with retries and exponential backoff across variants
+    values = pd.to_numeric(df[col_name], errors='coerce').to_numpy(dtype=float)
+    # int() truncation in the old per-row path meant anything below 1 was dropped
+    mask = values >= 1
+    dates = pd.DatetimeIndex(df['date'] if 'date' in df.columns else df.index)
+    dates = dates[mask].strftime('%Y-%m-%d').tolist()
+    ints = values[mask].astype(int).tolist()
+    return [{"date": d, "value": v} for d, v in zip(dates, ints)]
+
+
+async def _fetch_stored_series(kv: str, keyword: str, country: str, region: str, timeframe: str, retry_empty: bool = True):
+    """
+    Serve a query's 12-month series from the persistent trend store.
+    Recently refreshed series are returned without an upstream call; older
+    ones only fetch the recent window and merge it in (if that fails, the
+    stored series is served without retrying for TRENDS_STORE_RETRY_BACKOFF);
+    series that were never stored (or are too far behind) are fetched in
+    full and saved.
+    """
+    if not trend_store.TRENDS_STORE_ENABLED or timeframe != trend_store.STORE_TIMEFRAME:
+        return await _fetch_keyword_series(kv, keyword, country, region, timeframe, retry_empty=retry_empty)
+
+    try:
+        with tracing.span("trends_store"):
+            stored, last_fetched_at = await asyncio.to_thread(trend_store.load_series, kv, country)
+    except Exception as e:
+        logger.warning("Trend store read failed for '%s': %s", kv, e)
+        stored, last_fetched_at = [], None
+
+    if stored and trend_store.is_recent(last_fetched_at):
+        with _cache_lock:
+            _metrics['store_hits'] += 1
+        return trend_store.window(stored)
+
+    if trend_store.can_refresh_incrementally(stored):
+        store_key = (kv.lower(), country)
+        now = time.monotonic()
+        if _store_retry_after.get(store_key, 0.0) > now:
+            with _cache_lock:
+                _metrics['store_backoff_hits'] += 1
+            return trend_store.window(stored)
+        with _cache_lock:
+            _metrics['store_incremental_fetches'] += 1
+        recent = await _fetch_keyword_series(kv, keyword, country, region, trend_store.INCREMENTAL_TIMEFRAME, retry_empty=False)
+        merged = trend_store.merge_incremental(stored, recent) if recent else []
+        if merged:
+            _store_retry_after.pop(store_key, None)
+            await _save_series(kv, country, merged, replace_all=False)
+            stored = [p for p in stored if p["date"] < merged[0]["date"]] + merged
+        else:
+            logger.warning("Incremental Google Trends fetch failed for '%s'; serving stored series for %.0fs", kv, TRENDS_STORE_RETRY_BACKOFF)
+            _set_store_backoff(store_key, now)
+        return trend_store.window(stored)
+
+    with _cache_lock:
+        _metrics['store_full_fetches'] += 1
+    full = await _fetch_keyword_series(kv, keyword, country, region, timeframe, retry_empty=retry_empty)
+    if full:
+        await _save_series(kv, country, full, replace_all=True)
+    return full
+
+
+def _set_store_backoff(store_key, now: float):
+    _store_retry_after[store_key] = now + TRENDS_STORE_RETRY_BACKOFF
+    if len(_store_retry_after) > CACHE_MAX_ENTRIES:
+        for key in [k for k, until in _store_retry_after.items() if until <= now]:
+            del _store_retry_after[key]
+
+
+async def _save_series(kv: str, country: str, points: list, replace_all: bool):
+    try:
+        await asyncio.to_thread(trend_store.save_points, kv, country, points, replace_all)
+    except Exception as e:
+        # Persisting is best-effort; the request still gets its data
+        logger.warning("Trend store write failed for '%s': %s", kv, e)
+
+
+async def _fetch_keyword_series(kv: str, keyword: str, country: str, region: str, timeframe: str, retry_empty: bool = True):
+    """
+    Fetch one query's series with retries. Every call waits on the shared
+    token bucket, and retries back off with asyncio.sleep so no executor
+    thread is held while waiting. Gives up at once while the circuit is
+    open or the token queue is longer than TRENDS_RATE_MAX_WAIT.
+    Returns None if the fetch failed. With retry_empty=False, a response
+    without usable data returns [] straight away, so callers can tell
+    "Google has no data" from a failure.
+    """
     for attempt in range(1, MAX_RETRIES + 1):
-        for kv in keyword_variants:
-            try:
-                # If using region-biased query, note it in metrics
-                if kv != keyword:
-                    _metrics['regional_queries'] += 1
-
-                pytrends.build_payload([
-                    kv
-                ], cat=0, timeframe=timeframe, geo=country, gprop='')
-
-                interest_over_time_df = pytrends.interest_over_time()
-
-                if interest_over_time_df.empty:
-                    # if empty, continue to try other variants or retries
-                    print(f"No Google Trends data for '{kv}' (region {region}) - empty result")
-                    continue
-
-                interest_over_time_df = interest_over_time_df.reset_index()
-
-                historical_data = []
-                for _, row in interest_over_time_df.iterrows():
-                    # use kv as column if present, otherwise try keyword
-                    col_name = kv if kv in interest_over_time_df.columns else keyword
-                    value = None
-                    try:
-                        value = int(row[col_name]) if col_name in row and row[col_name] is not None else None
-                    except Exception:
-                        # fallback: try the first non-date column
-                        cols = [c for c in interest_over_time_df.columns if c != 'date']
-                        if cols:
-                            try:
-                                value = int(row[cols[0]])
-                            except Exception:
-                                value = None
-
-                    if value and value > 0:
-                        historical_data.append({
-                            "date": row['date'].strftime('%Y-%m-%d'),
-                            "value": value
-                        })
-
-                final = historical_data if historical_data else None
-                if final:
-                    # record that region-bias produced results if kv included region
-                    if kv != keyword:
-                        _metrics['regional_success'] += 1
-                    _set_cached(cache_key, final)
-                    return final
-
-            except Exception as e:
-                # Detect rate limit / 429-like errors
-                err_msg = str(e).lower()
-                is_rate_limit = '429' in err_msg or 'too many' in err_msg or 'responseerror' in err_msg
-                print(f"⚠️ Google Trends attempt {attempt} failed for '{kv}' in {region}: {e}")
-
-                # Increment retry metrics
+        if _circuit.is_open():
+            return None
+        try:
+            # Includes the batching window and rate limiter wait
+            with tracing.span("pytrends"):
+                interest_over_time_df = await _interest_over_time(kv, timeframe, country)
+
+            if interest_over_time_df.empty:
+                logger.info("No Google Trends data for '%s' (region %s) - empty result", kv, region)
+                if not retry_empty:
+                    return []
+            else:
+                historical_data = _frame_to_series(interest_over_time_df, kv, keyword)
+                if historical_data:
+                    return historical_data
+                if not retry_empty:
+                    return []
+
+        except (CircuitOpenError, RateLimitWaitExceeded):
+            # Retrying would only queue again; fall back now
+            return None
+        except Exception as e:
+            # Detect rate limit / 429-like errors
+            is_rate_limit = _is_rate_limit_error(e)
+            logger.warning("Google Trends attempt %d failed for '%s' in %s: %s", attempt, kv, region, e)
+
+            # Increment retry metrics
+            with _cache_lock:
                 _metrics['retries'] += 1
                 if is_rate_limit:
                     _metrics['rate_limit_hits'] += 1
 
-                # If we got a rate limit, break out of kv loop and backoff
-                if is_rate_limit:
-                    break
-
-        # End of variants loop; if we reach here we will backoff then retry
         if attempt < MAX_RETRIES:
             backoff = BACKOFF_BASE * (2 ** (attempt - 1))
-            print(f"⏳ Retrying in {backoff} seconds... (attempt {attempt})")
-            time.sleep(backoff)
-            continue
+            logger.info("Retrying in %s seconds... (attempt %d)", backoff, attempt)
+            with tracing.span("backoff"):
+                await asyncio.sleep(backoff)
 
-        # All retries & variants failed - return demo data
-        print(f"❌ Google Trends failed after {MAX_RETRIES} attempts for '{keyword}' in {region}. Returning demo data.")
-        _metrics['fallbacks'] += 1
-        result = generate_demo_historical_data(keyword, region=region)
-        _set_cached(cache_key, result)
-        return result
+    return None
 
 
 def generate_demo_historical_data(keyword: str, region: str = "KE"):
@@ -211,4 +715,38 @@ def generate_demo_historical_data(keyword: str, region: str = "KE"):
 def get_trends_metrics():
     """Return a copy of current trends metrics (for debugging/monitoring)."""
     with _cache_lock:
-        return dict(_metrics)
\ No newline at end of file
+        stats = dict(_metrics)
+    stats['inflight_fetches'] = len(_inflight)
+    stats['rate_limiter'] = _rate_limiter.stats()
+    stats['pending_batches'] = len(_pending_batches)
+    stats['circuit_breaker'] = _circuit.stats()
+    stats['cache'] = _trends_cache.stats()
+    stats['fresh_ttl_seconds'] = CACHE_TTL
+    stats['stale_max_age_seconds'] = STALE_MAX_AGE
+    return stats
+
+def _collect_trend_events():
+    with _cache_lock:
+        return [((name,), value) for name, value in _metrics.items()]
+
+
+metrics.register_callback(
+    'twoknow_trends_events_total', 'counter',
+    'Google Trends pipeline events (cache hits, retries, fallbacks, batching).',
+    ('event',), _collect_trend_events
+)
+metrics.register_callback(
+    'twoknow_trends_inflight_fetches', 'gauge',
+    'Upstream Google Trends fetches currently in flight (after coalescing).',
+    (), lambda: [((), len(_inflight))]
+)
+metrics.register_callback(
+    'twoknow_trends_pending_batches', 'gauge',
+    'Micro-batches waiting for their window to close.',
+    (), lambda: [((), len(_pending_batches))]
+)
+metrics.register_callback(
+    'twoknow_trends_rate_tokens', 'gauge',
+    'Google Trends rate limiter tokens currently available.',
+    (), lambda: [((), rate_budget_available())]
+)
@@ -0,0 +1,140 @@
+import logging
+import os
+import httpx
+from dotenv import load_dotenv
+from .. import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Connection pool settings for outbound API calls (Serper)
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '20'))
+HTTP_MAX_KEEPALIVE = int(os.getenv('HTTP_MAX_KEEPALIVE', '10'))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '30'))
+HTTP_ENABLE_HTTP2 = os.getenv('HTTP_ENABLE_HTTP2', 'false').lower() == 'true'
+
+# Per-phase timeouts (seconds)
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '10'))
+HTTP_WRITE_TIMEOUT = float(os.getenv('HTTP_WRITE_TIMEOUT', '10'))
+HTTP_POOL_TIMEOUT = float(os.getenv('HTTP_POOL_TIMEOUT', '5'))
+
+_client = None
+_transport = None
+
+_stats = {
+    'requests': 0,
+    'tcp_connects': 0,
+    'tls_handshakes': 0
+}
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+async def _trace(event_name, info):
+    """httpcore trace hook: counts new connections so pool reuse is visible."""
+    if event_name == 'connection.connect_tcp.complete':
+        _stats['tcp_connects'] += 1
+    elif event_name == 'connection.start_tls.complete':
+        _stats['tls_handshakes'] += 1
+
+
+async def start_http_client():
+    """Create the shared AsyncClient. Called from the FastAPI lifespan."""
+    global _client, _transport
+    if _client is not None:
+        return _client
+
+    http2 = HTTP_ENABLE_HTTP2
+    if http2 and not _http2_available():
+        logger.warning("HTTP_ENABLE_HTTP2 is set but the 'h2' package is not installed. Using HTTP/1.1.")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+    timeout = httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT,
+        read=HTTP_READ_TIMEOUT,
+        write=HTTP_WRITE_TIMEOUT,
+        pool=HTTP_POOL_TIMEOUT
+    )
+    _transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+    _client = httpx.AsyncClient(transport=_transport, timeout=timeout)
+    logger.info("Shared HTTP client started (max %d connections, http2=%s)", HTTP_MAX_CONNECTIONS, http2)
+    return _client
+
+
+async def close_http_client():
+    """Close the shared AsyncClient and its pooled connections."""
+    global _client, _transport
+    if _client is not None:
+        await _client.aclose()
+        logger.info("Shared HTTP client closed")
+    _client = None
+    _transport = None
+
+
+async def get_http_client():
+    """Return the shared client, creating it lazily if the lifespan did not run."""
+    if _client is None:
+        await start_http_client()
+    return _client
+
+
+async def request(method: str, url: str, **kwargs):
+    """Send a request through the shared pool, with connection tracing enabled."""
+    client = await get_http_client()
+    _stats['requests'] += 1
+    extensions = kwargs.pop('extensions', {}) or {}
+    extensions.setdefault('trace', _trace)
+    return await client.request(method, url, extensions=extensions, **kwargs)
+
+
+def get_pool_stats():
+    """Return connection pool statistics for sizing the pool."""
+    stats = dict(_stats)
+    stats['max_connections'] = HTTP_MAX_CONNECTIONS
+    stats['max_keepalive'] = HTTP_MAX_KEEPALIVE
+    stats['started'] = _client is not None
+
+    active = idle = 0
+    try:
+        # httpcore's pool is not part of httpx's public API, so guard it
+        for conn in _transport._pool.connections:
+            if conn.is_idle():
+                idle += 1
+            else:
+                active += 1
+    except Exception:
+        pass
+    stats['active_connections'] = active
+    stats['idle_connections'] = idle
+    stats['reused_requests'] = max(stats['requests'] - stats['tcp_connects'], 0)
+    return stats
+
+
+def _collect_pool_connections():
+    stats = get_pool_stats()
+    return [(('active',), stats['active_connections']), (('idle',), stats['idle_connections'])]
+
+
+metrics.register_callback(
+    'twoknow_http_client_connections', 'gauge',
+    'Outbound HTTP pool connections by state.',
+    ('state',), _collect_pool_connections
+)
+metrics.register_callback(
+    'twoknow_http_client_tcp_connects_total', 'counter',
+    'New outbound TCP connections (requests minus these were served by keep-alive).',
+    (), lambda: [((), _stats['tcp_connects'])]
+)
@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+from collections import deque
+from functools import lru_cache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Sector vocabulary: sectors in priority order, each with its terms and markets
+DEFAULT_SECTORS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "market_sectors.json")
+MARKET_SECTORS_PATH = os.getenv("MARKET_SECTORS_PATH", DEFAULT_SECTORS_PATH)
+
+
+class KeywordClassifier:
+    """
+    Aho-Corasick automaton over every sector term.
+    classify() makes one pass over the keyword regardless of how many terms
+    are loaded, and returns the highest-priority sector (earliest in the
+    vocabulary file) with a whole-word match.
+    """
+
+    def __init__(self, sectors: list, default_sector: str, default_markets: list):
+        self.sectors = sectors
+        self.default_sector = default_sector
+        self.default_markets = default_markets
+        self.term_count = 0
+
+        # Trie as parallel lists: transitions, failure links, and for each
+        # node the matches ending there as (term length, sector index)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for index, sector in enumerate(sectors):
+            for term in sector["terms"]:
+                self._add(term.lower().strip(), index)
+        self._build_failure_links()
+
+    def _add(self, term: str, sector_index: int):
+        if not term:
+            return
+        node = 0
+        for char in term:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(term), sector_index))
+        self.term_count += 1
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit matches from the suffix node so one lookup sees them all
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def best_match(self, text: str):
+        """Return the index of the best matching sector in `text`, or None."""
+        text = text.lower()
+        length = len(text)
+        best = None
+        node = 0
+        for pos, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            if not self._out[node]:
+                continue
+            # Whole-word matches only ("rice" must not match "price")
+            if pos + 1 < length and text[pos + 1].isalnum():
+                continue
+            for term_length, sector_index in self._out[node]:
+                start = pos - term_length + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if best is None or sector_index < best:
+                    best = sector_index
+            if best == 0:
+                break
+        return best
+
+    def classify(self, keyword: str):
+        """Return (sector, markets) for a keyword."""
+        index = self.best_match(keyword)
+        if index is None:
+            return self.default_sector, self.default_markets
+        sector = self.sectors[index]
+        return sector["name"].capitalize(), sector["markets"]
+
+
+def load_classifier(path: str = MARKET_SECTORS_PATH):
+    """Build the classifier from a JSON vocabulary file."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    default = data.get("default", {})
+    classifier = KeywordClassifier(
+        sectors=data["sectors"],
+        default_sector=default.get("sector", "General"),
+        default_markets=default.get("markets", ["Nairobi CBD", "Mombasa", "Kisumu"])
+    )
+    logger.info("Keyword classifier loaded: %d terms in %d sectors", classifier.term_count, len(classifier.sectors))
+    return classifier
+
+
+# Built once at import; shared by the trends and Serper paths
+_classifier = load_classifier()
+
+
+@lru_cache(maxsize=4096)
+def _classify_cached(keyword: str):
+    return _classifier.classify(keyword)
+
+
+def classify_keyword(keyword: str):
+    """
+    Classify keyword into market sector and suggest physical markets.
+    """
+    sector, markets = _classify_cached(keyword.lower().strip())
+    return sector, list(markets)
+
+
+def get_sector_vocabulary():
+    """Sector vocabulary in the {name: {"sectors": terms, "markets": markets}} shape."""
+    return {
+        sector["name"]: {"sectors": sector["terms"], "markets": sector["markets"]}
+        for sector in _classifier.sectors
+    }
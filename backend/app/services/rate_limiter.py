@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+
+class RateLimitWaitExceeded(Exception):
+    """Raised by TokenBucket.acquire() when a token is further away than max_wait."""
+
+
+class TokenBucket:
+    """
+    Async token bucket used to space out calls to an upstream API.
+    Tokens refill continuously at `rate` per second up to `burst`;
+    acquire() waits (without blocking the event loop) until one is available.
+    With `max_wait`, a caller whose turn would come later than that is
+    refused at once (RateLimitWaitExceeded) instead of joining the queue.
+    """
+
+    def __init__(self, rate: float, burst: int, max_wait: float = None):
+        self.rate = max(float(rate), 0.001)
+        self.burst = max(int(burst), 1)
+        self.max_wait = max_wait if max_wait is None or max_wait > 0 else None
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = None
+        self._waiting = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.refused = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def expected_wait(self):
+        """Seconds until a new caller would get a token (every queued waiter goes first)."""
+        self._refill()
+        return max(self._waiting + 1 - self._tokens, 0.0) / self.rate
+
+    def backlogged(self):
+        """True while new callers would be refused for waiting longer than max_wait."""
+        return self.max_wait is not None and self.expected_wait() > self.max_wait
+
+    async def acquire(self):
+        """Wait for a token and consume it. Returns the time spent waiting."""
+        # Lock is created lazily so the bucket can be built at import time
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        if self.backlogged():
+            self.refused += 1
+            raise RateLimitWaitExceeded(
+                f"next token in {self.expected_wait():.1f}s exceeds max wait of {self.max_wait}s"
+            )
+
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            # Waiters queue on the lock so tokens are handed out in arrival order
+            async with self._lock:
+                self._refill()
+                while self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= 1
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.total_wait += waited
+        return waited
+
+    def stats(self):
+        self._refill()
+        return {
+            'rate_per_sec': self.rate,
+            'burst': self.burst,
+            'tokens_available': round(self._tokens, 2),
+            'acquired': self.acquired,
+            'total_wait_seconds': round(self.total_wait, 3),
+            'waiting': self._waiting,
+            'max_wait_seconds': self.max_wait,
+            'refused': self.refused
+        }
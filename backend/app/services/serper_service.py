@@ -1,19 +1,64 @@
+import logging
 import os
-import httpx
 from dotenv import load_dotenv
 import asyncio
 import random
 from datetime import datetime, timedelta
+import time
+from . import http_client
+from .. import metrics, tracing
+from .cache import create_cache_backend
+from .circuit_breaker import CircuitBreaker
+from .keyword_classifier import classify_keyword
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
+SERPER_API_URL = os.getenv("SERPER_API_URL", "https://google.serper.dev/search")
+
+# Serper is metered, so successful search results are cached (TTL + LRU)
+SERPER_CACHE_TTL = int(os.getenv("SERPER_CACHE_TTL", "1800"))  # seconds, default 30 minutes
+SERPER_CACHE_MAX_ENTRIES = int(os.getenv("SERPER_CACHE_MAX_ENTRIES", "1000"))
+_serper_cache = create_cache_backend('serper', ttl=SERPER_CACHE_TTL, max_entries=SERPER_CACHE_MAX_ENTRIES)
+
+# Circuit breaker: after repeated errors or 429s, skip Serper for a while and
+# return the fallback result immediately. 0 disables a trigger.
+SERPER_CIRCUIT_FAILURES = int(os.getenv("SERPER_CIRCUIT_FAILURES", "5"))
+SERPER_CIRCUIT_RATE_LIMITS = int(os.getenv("SERPER_CIRCUIT_RATE_LIMITS", "3"))
+SERPER_CIRCUIT_OPEN_SECONDS = float(os.getenv("SERPER_CIRCUIT_OPEN_SECONDS", "30"))
+SERPER_CIRCUIT_MAX_OPEN_SECONDS = float(os.getenv("SERPER_CIRCUIT_MAX_OPEN_SECONDS", "300"))
+_circuit = CircuitBreaker(
+    "serper",
+    failure_threshold=SERPER_CIRCUIT_FAILURES,
+    rate_limit_threshold=SERPER_CIRCUIT_RATE_LIMITS,
+    open_seconds=SERPER_CIRCUIT_OPEN_SECONDS,
+    max_open_seconds=SERPER_CIRCUIT_MAX_OPEN_SECONDS
+)
+
+
+def _fallback_result(error: str):
+    return {
+        "relevance_score": 50,
+        "market_sector": "General",
+        "regions": ["Nairobi"],
+        "error": error
+    }
 
-async def get_serper_data(keyword: str, country: str = "ke", region: str = "KE"):
+
+def _serper_cache_key(query_text: str, country: str, region: str):
+    # Normalize so "Maize  market" and "maize market" share an entry
+    normalized = " ".join(query_text.lower().split())
+    return f"{normalized}::{country.lower()}::{region}"
+
+async def get_serper_data(keyword: str, country: str = "ke", region: str = "KE", classification: tuple = None):
     """
     Fetch real-time search data for a keyword in a specific Kenyan region.
     Returns relevance score and market insights adjusted for the region.
+    Pass `classification` (sector, markets) if the caller already classified the keyword.
     """
+    market_sector, _ = classification or classify_keyword(keyword)
     # Region-specific adjustments for search
     region_queries = {
         "Nairobi": f"{keyword} Nairobi Kenya market",
@@ -30,7 +75,7 @@ async def get_serper_data(keyword: str, country: str = "ke", region: str = "KE")
     
     # If no API key, return demo data with region-specific insights
     if not SERPER_API_KEY or SERPER_API_KEY == "not-set-yet":
-        print(f"⚠️  SERPER_API_KEY not set. Using demo data for: {keyword} in {region}")
+        logger.debug("SERPER_API_KEY not set. Using demo data for: %s in %s", keyword, region)
         
         # Region-specific relevance scores
         region_modifiers = {
@@ -51,13 +96,10 @@ async def get_serper_data(keyword: str, country: str = "ke", region: str = "KE")
         # Demo relevance score based on keyword
         if "maize" in keyword.lower():
             base_relevance = 75
-            market_sector = "Agriculture"
         elif "phone" in keyword.lower():
             base_relevance = 65
-            market_sector = "Electronics"
         else:
             base_relevance = random.randint(40, 60)
-            market_sector = "General"
         
         relevance_score = base_relevance * modifier
         
@@ -97,43 +139,60 @@ async def get_serper_data(keyword: str, country: str = "ke", region: str = "KE")
         "hl": "en"
     }
     
+    cache_key = _serper_cache_key(query_text, country, region)
+    with tracing.span("serper_cache"):
+        cached = await _serper_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Serving cached Serper results for %s", cache_key)
+        return dict(cached)
+
+    if not _circuit.allow():
+        logger.debug("Serper circuit open; returning fallback for %s", cache_key)
+        return _fallback_result("Serper circuit open")
+
+    started = time.perf_counter()
+    response = None
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                "https://google.serper.dev/search",
+        # Shared pooled client (keep-alive) instead of a new connection per call
+        with tracing.span("serper"):
+            response = await http_client.request(
+                "POST",
+                SERPER_API_URL,
                 json=payload,
                 headers=headers
             )
-            response.raise_for_status()
-            data = response.json()
-            
-            organic_results = data.get("organic", [])
-            relevance_score = min(len(organic_results) * 10, 100)
-            
-            # Market sector detection
-            market_sector = "General"
-            keyword_lower = keyword.lower()
-            if "maize" in keyword_lower or "corn" in keyword_lower or "wheat" in keyword_lower:
-                market_sector = "Agriculture"
-            elif "phone" in keyword_lower or "mobile" in keyword_lower:
-                market_sector = "Electronics"
-            elif "car" in keyword_lower or "vehicle" in keyword_lower:
-                market_sector = "Automotive"
-            
-            regions = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret"]
-            
-            return {
-                "relevance_score": relevance_score,
-                "market_sector": market_sector,
-                "regions": regions[:3],
-                "serper_data": data
-            }
-            
+        outcome = "rate_limited" if response.status_code == 429 else "ok" if response.is_success else "error"
+        metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - started, upstream="serper", outcome=outcome)
+        _circuit.record(outcome)
+        response.raise_for_status()
+        data = response.json()
+        
+        organic_results = data.get("organic", [])
+        relevance_score = min(len(organic_results) * 10, 100)
+        
+        regions = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret"]
+        
+        result = {
+            "relevance_score": relevance_score,
+            "market_sector": market_sector,
+            "regions": regions[:3],
+            "serper_data": data
+        }
+        await _serper_cache.set(cache_key, result)
+        return dict(result)
+        
     except Exception as e:
-        print(f"❌ Serper API error: {e}")
-        return {
-            "relevance_score": 50,
-            "market_sector": "General",
-            "regions": ["Nairobi"],
-            "error": str(e)
-        }
\ No newline at end of file
+        if response is None:
+            # Connection or timeout failure: no response was timed above
+            metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - started, upstream="serper", outcome="error")
+            _circuit.record("error")
+        logger.error("Serper API error: %s", e)
+        return _fallback_result(str(e))
+
+
+def get_serper_metrics():
+    """Return Serper cache and circuit breaker statistics (for debugging/monitoring)."""
+    return {
+        "cache": _serper_cache.stats(),
+        "circuit_breaker": _circuit.stats()
+    }
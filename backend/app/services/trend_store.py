@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import delete, func, select, tuple_
+from ..database import SessionLocal
+from .. import models
+from .cache import register_sweep_hook
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Persistent per-keyword/geo series so restarts and cache misses don't
+# re-download a full year from Google Trends.
+TRENDS_STORE_ENABLED = os.getenv('TRENDS_STORE_ENABLED', 'true').lower() == 'true'
+# Serve straight from the database if the series was refreshed this recently (seconds)
+TRENDS_STORE_REFRESH_INTERVAL = int(os.getenv('TRENDS_STORE_REFRESH_INTERVAL', str(6 * 3600)))
+# The only timeframe stored; other timeframes always go upstream
+STORE_TIMEFRAME = "today 12-m"
+# Incremental refreshes fetch this window; series last stored before
+# INCREMENTAL_MAX_GAP_DAYS ago are re-fetched in full instead.
+INCREMENTAL_TIMEFRAME = "today 3-m"
+INCREMENTAL_MAX_GAP_DAYS = 75
+SERIES_DAYS = 365
+# Eviction, run from the cache sweeper every TRENDS_STORE_EVICT_INTERVAL
+# seconds: series not refreshed for TRENDS_STORE_RETENTION_DAYS (past the
+# incremental gap they are re-fetched in full anyway), then the least
+# recently refreshed series beyond TRENDS_STORE_MAX_SERIES (0: no cap).
+TRENDS_STORE_RETENTION_DAYS = int(os.getenv('TRENDS_STORE_RETENTION_DAYS', str(INCREMENTAL_MAX_GAP_DAYS)))
+TRENDS_STORE_MAX_SERIES = int(os.getenv('TRENDS_STORE_MAX_SERIES', '20000'))
+TRENDS_STORE_EVICT_INTERVAL = float(os.getenv('TRENDS_STORE_EVICT_INTERVAL', '3600'))
+# Series deleted per statement
+_EVICT_CHUNK = 500
+
+_last_eviction = None
+_stats = {'evictions': 0, 'evicted_series': 0}
+
+
+def _as_utc(value):
+    # SQLite hands back naive datetimes; they were written in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def load_series(keyword: str, geo: str):
+    """
+    Return (points, last_fetched_at) for a stored series, where points is
+    a list of {"date", "value"} ordered by date. ([], None) if nothing is stored.
+    """
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(models.TrendPoint.date, models.TrendPoint.value, models.TrendPoint.fetched_at)
+            .where(models.TrendPoint.keyword == keyword.lower(), models.TrendPoint.geo == geo)
+            .order_by(models.TrendPoint.date)
+        ).all()
+    finally:
+        db.close()
+
+    if not rows:
+        return [], None
+    points = [{"date": row.date.strftime('%Y-%m-%d'), "value": row.value} for row in rows]
+    last_fetched_at = max(_as_utc(row.fetched_at) for row in rows if row.fetched_at is not None)
+    return points, last_fetched_at
+
+
+def save_points(keyword: str, geo: str, points: list, replace_all: bool = False):
+    """
+    Merge points into the stored series. Stored points on or after the first
+    new date are replaced (the latest week is usually partial and changes).
+    """
+    if not points:
+        return
+    keyword = keyword.lower()
+    first_date = datetime.strptime(points[0]["date"], '%Y-%m-%d').date()
+    now = datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=SERIES_DAYS + 31)).date()
+
+    db = SessionLocal()
+    try:
+        conditions = [models.TrendPoint.keyword == keyword, models.TrendPoint.geo == geo]
+        if replace_all:
+            db.execute(delete(models.TrendPoint).where(*conditions))
+        else:
+            # Drop what the new window replaces, plus points too old to serve
+            db.execute(delete(models.TrendPoint).where(*conditions, models.TrendPoint.date >= first_date))
+            db.execute(delete(models.TrendPoint).where(*conditions, models.TrendPoint.date < cutoff))
+        db.add_all([
+            models.TrendPoint(
+                keyword=keyword,
+                geo=geo,
+                date=datetime.strptime(point["date"], '%Y-%m-%d').date(),
+                value=int(point["value"]),
+                fetched_at=now
+            )
+            for point in points
+        ])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def is_recent(last_fetched_at):
+    if last_fetched_at is None:
+        return False
+    return (datetime.now(timezone.utc) - last_fetched_at).total_seconds() < TRENDS_STORE_REFRESH_INTERVAL
+
+
+def can_refresh_incrementally(points: list):
+    if not points:
+        return False
+    last_date = datetime.strptime(points[-1]["date"], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - last_date).days <= INCREMENTAL_MAX_GAP_DAYS
+
+
+def merge_incremental(stored: list, recent: list):
+    """
+    Fold a recent window (daily points, scaled 0-100 within that window) into
+    the stored weekly series. Daily points are averaged into the stored
+    series' weeks, then scaled so the weeks both series cover line up, since
+    Google normalizes each request to its own peak. Returns only the points
+    from the last stored week onward.
+    """
+    if not stored or not recent:
+        return []
+    anchor = pd.Timestamp(stored[-1]["date"])
+    daily = pd.Series(
+        [p["value"] for p in recent],
+        index=pd.to_datetime([p["date"] for p in recent])
+    )
+    # Bucket each day into the 7-day week that the stored dates start
+    week_starts = daily.index - pd.to_timedelta((daily.index - anchor).days % 7, unit='D')
+    weekly = daily.groupby(week_starts).mean()
+
+    stored_by_date = {pd.Timestamp(p["date"]): p["value"] for p in stored}
+    # The last stored week may have been partial, so leave it out of the overlap
+    overlap = [d for d in weekly.index if d in stored_by_date and d < anchor]
+    new_total = sum(weekly[d] for d in overlap)
+    scale = sum(stored_by_date[d] for d in overlap) / new_total if overlap and new_total > 0 else 1.0
+
+    merged = []
+    for date, value in weekly[weekly.index >= anchor].items():
+        scaled = int(round(value * scale))
+        if scaled >= 1:
+            merged.append({"date": date.strftime('%Y-%m-%d'), "value": scaled})
+    return merged
+
+
+def window(points: list):
+    """
+    The last SERIES_DAYS of a series, renormalized to a peak of 100 if
+    incremental merges pushed values above Google's 0-100 scale.
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=SERIES_DAYS)).strftime('%Y-%m-%d')
+    points = [p for p in points if p["date"] >= cutoff]
+    peak = max((p["value"] for p in points), default=0)
+    if peak > 100:
+        points = [{"date": p["date"], "value": max(int(round(p["value"] * 100 / peak)), 1)} for p in points]
+    return points
+
+
+def evict_series(now: datetime = None):
+    """
+    Delete series that stopped being requested: those not refreshed within
+    TRENDS_STORE_RETENTION_DAYS, then the least recently refreshed ones past
+    TRENDS_STORE_MAX_SERIES. Returns the number of series deleted.
+    (Blocking; call from a worker thread.)
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=TRENDS_STORE_RETENTION_DAYS)
+    points = models.TrendPoint
+    newest = func.max(points.fetched_at).label("newest")
+    db = SessionLocal()
+    try:
+        series = db.execute(
+            select(points.keyword, points.geo, newest)
+            .group_by(points.keyword, points.geo)
+            .order_by(newest.desc())
+        ).all()
+        doomed = [
+            (row.keyword, row.geo)
+            for rank, row in enumerate(series)
+            if row.newest is None or _as_utc(row.newest) < cutoff
+            or (TRENDS_STORE_MAX_SERIES > 0 and rank >= TRENDS_STORE_MAX_SERIES)
+        ]
+        for i in range(0, len(doomed), _EVICT_CHUNK):
+            db.execute(delete(points).where(tuple_(points.keyword, points.geo).in_(doomed[i:i + _EVICT_CHUNK])))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    _stats['evictions'] += 1
+    _stats['evicted_series'] += len(doomed)
+    return len(doomed)
+
+
+async def _sweep():
+    global _last_eviction
+    if not TRENDS_STORE_ENABLED:
+        return
+    now = time.monotonic()
+    if _last_eviction is not None and now - _last_eviction < TRENDS_STORE_EVICT_INTERVAL:
+        return
+    _last_eviction = now
+    removed = await asyncio.to_thread(evict_series)
+    if removed:
+        logger.info("Evicted %d unused series from the trend store", removed)
+
+
+register_sweep_hook(_sweep)
+
+
+def get_store_stats():
+    """Series and point counts (blocking; call from a worker thread)."""
+    db = SessionLocal()
+    try:
+        series, points = db.execute(
+            select(
+                func.count(func.distinct(models.TrendPoint.keyword + '::' + models.TrendPoint.geo)),
+                func.count(models.TrendPoint.id)
+            )
+        ).one()
+    finally:
+        db.close()
+    return {
+        "enabled": TRENDS_STORE_ENABLED,
+        "series": series,
+        "points": points,
+        "max_series": TRENDS_STORE_MAX_SERIES,
+        "retention_days": TRENDS_STORE_RETENTION_DAYS,
+        **_stats
+    }
@@ -1,6 +1,17 @@
 from .serper_service import get_serper_data
-from .google_trends_service import get_historical_trends
+from .google_trends_service import get_historical_trends, get_historical_trends_with_status
+from .keyword_classifier import classify_keyword, get_sector_vocabulary
+from .cache_warmer import record_request
+from .. import metrics, tracing
 import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Max trend analyses run at once for a single batch request
+TRENDS_BATCH_CONCURRENCY = int(os.getenv('TRENDS_BATCH_CONCURRENCY', '8'))
 
 # Regional market mapping for Kenya
 REGIONAL_MARKETS = {
@@ -51,45 +62,8 @@ REGIONAL_MARKETS = {
     }
 }
 
-# Market mapping for keyword classification
-KENYAN_MARKETS = {
-    "agriculture": {
-        "sectors": ["agriculture", "farming", "agribusiness", "maize", "wheat", "rice", "vegetables"],
-        "markets": ["Wakulima Market", "Kariakor Market", "Kisumu Market", "Mombasa Market"]
-    },
-    "electronics": {
-        "sectors": ["electronics", "technology", "phones", "computers", "mobile"],
-        "markets": ["Biashara Street", "River Road", "Nyamakima", "Mombasa's Mwembe Tayari"]
-    },
-    "automotive": {
-        "sectors": ["automotive", "vehicles", "cars", "spare parts"],
-        "markets": ["Industrial Area", "Mombasa Road", "Kariobangi", "Gikomba"]
-    },
-    "fashion": {
-        "sectors": ["fashion", "clothing", "textiles"],
-        "markets": ["Gikomba", "Toi Market", "Muthurwa", "Kisumu's Kibuye"]
-    }
-}
-
-def classify_keyword(keyword: str):
-    """
-    Classify keyword into market sector and suggest physical markets.
-    """
-    keyword_lower = keyword.lower()
-    
-    # Default values
-    sector = "General"
-    markets = ["Nairobi CBD", "Mombasa", "Kisumu"]
-    
-    # Check each category
-    for category, data in KENYAN_MARKETS.items():
-        for sector_keyword in data["sectors"]:
-            if sector_keyword in keyword_lower:
-                sector = category.capitalize()
-                markets = data["markets"]
-                return sector, markets
-    
-    return sector, markets
+# Market mapping for keyword classification (loaded from app/data/market_sectors.json)
+KENYAN_MARKETS = get_sector_vocabulary()
 
 def get_region_markets(region: str) -> list:
     """
@@ -111,21 +85,40 @@ def filter_markets_by_region(markets: list, region: str) -> list:
     filtered = [m for m in markets if m in region_markets]
     return filtered if filtered else region_markets[:3]
 
-async def get_trend_analysis(keyword: str, region: str = "KE"):
+async def get_trend_analysis(keyword: str, region: str = "KE", record_popularity: bool = True):
     """
     Main function to get complete trend analysis for a keyword with regional focus.
+    record_popularity=False leaves the cache warmer's popularity counts
+    alone (for regions expanded by a comparison rather than asked for).
     """
-    print(f"🔍 Analyzing trends for: {keyword} in {region}")
+    started = time.perf_counter()
+    try:
+        with tracing.span("trend_analysis"):
+            result = await _analyze_trends(keyword, region, record_popularity)
+    except BaseException:
+        metrics.TREND_ANALYSIS_LATENCY.observe(time.perf_counter() - started, freshness="error")
+        raise
+    metrics.TREND_ANALYSIS_LATENCY.observe(time.perf_counter() - started, freshness=result["freshness"])
+    return result
+
+
+async def _analyze_trends(keyword: str, region: str, record_popularity: bool = True):
+    logger.info("Analyzing trends for: %s in %s", keyword, region)
     
+    # Track popularity so the cache warmer keeps hot keywords fresh
+    if record_popularity:
+        record_request(keyword, region)
+
+    # Classify keyword once; Serper reuses the result
+    with tracing.span("classify"):
+        sector, markets = classify_keyword(keyword)
+
     # Run both API calls concurrently
-    serper_task = get_serper_data(keyword, region=region)
-    historical_task = asyncio.to_thread(get_historical_trends, keyword, region=region)
+    serper_task = get_serper_data(keyword, region=region, classification=(sector, markets))
+    historical_task = get_historical_trends_with_status(keyword, region=region)
     
     # Wait for both to complete
-    serper_result, historical_data = await asyncio.gather(serper_task, historical_task)
-    
-    # Classify keyword
-    sector, markets = classify_keyword(keyword)
+    serper_result, (historical_data, freshness) = await asyncio.gather(serper_task, historical_task)
     
     # Use Serper's sector if available, otherwise use our classification
     market_sector = serper_result.get("market_sector", sector)
@@ -172,7 +165,95 @@ async def get_trend_analysis(keyword: str, region: str = "KE"):
         "data_source": "Serper API + Google Trends",
         "country": "Kenya",
         "region_coordinates": REGIONAL_MARKETS.get(region, {}).get("coordinates", "Kenya"),
-        "region_handling": regional_method
+        "region_handling": regional_method,
+        "freshness": freshness
     }
 
     return result
+
+
+async def iter_trend_analyses(keywords: list, regions: list, concurrency: int = TRENDS_BATCH_CONCURRENCY):
+    """
+    Run get_trend_analysis for every keyword x region pair, at most
+    `concurrency` at a time, yielding each result as soon as it finishes.
+    Pairs that differ only by case/whitespace are analysed once.
+    Batches are bulk jobs, so they don't count toward the cache warmer's
+    popularity ranking.
+    """
+    pairs = {}
+    for keyword in keywords:
+        for region in regions:
+            pairs.setdefault((keyword.strip().lower(), region), (keyword.strip(), region))
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(keyword, region):
+        async with semaphore:
+            try:
+                return await get_trend_analysis(keyword, region=region, record_popularity=False)
+            except Exception as e:
+                logger.error("Batch item failed for %s in %s: %s", keyword, region, e)
+                return {"keyword": keyword, "region": region, "error": str(e)}
+
+    tasks = [asyncio.ensure_future(run(keyword, region)) for keyword, region in pairs.values() if keyword]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away mid-stream: don't keep working for nobody
+        for task in tasks:
+            task.cancel()
+
+
+async def get_regional_comparison(keywords: list, regions: list = None, concurrency: int = TRENDS_BATCH_CONCURRENCY):
+    """
+    Score every keyword in every region in one pass, for regional heatmaps.
+    The country-level series for each keyword is fetched first so all
+    regions share it; the region-biased queries then run concurrently.
+    Returns a keyword x region matrix of overall scores.
+    """
+    regions = regions or list(REGIONAL_MARKETS.keys())
+    keywords = list(dict.fromkeys(k.strip() for k in keywords if k and k.strip()))
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def analyse(keyword, region):
+        async with semaphore:
+            try:
+                return await get_trend_analysis(keyword, region=region, record_popularity=False)
+            except Exception as e:
+                logger.error("Regional comparison failed for %s in %s: %s", keyword, region, e)
+                return None
+
+    # One popularity hit per keyword, for the country-level series every
+    # comparison needs; the expanded regions weren't asked for individually
+    for keyword in keywords:
+        record_request(keyword, "KE")
+
+    # Shared country-level fetch (geo=KE) for every keyword, once
+    await asyncio.gather(*[get_historical_trends(keyword, region="KE") for keyword in keywords])
+
+    results = await asyncio.gather(*[
+        analyse(keyword, region) for keyword in keywords for region in regions
+    ])
+
+    scores = []
+    details = {}
+    for i, keyword in enumerate(keywords):
+        row = results[i * len(regions):(i + 1) * len(regions)]
+        scores.append([r["overall_score"] if r else None for r in row])
+        details[keyword] = {
+            region: {
+                "overall_score": r["overall_score"],
+                "live_trend_score": r["live_trend_score"],
+                "market_sector": r["market_sector"]
+            } if r else None
+            for region, r in zip(regions, row)
+        }
+
+    return {
+        "keywords": keywords,
+        "regions": regions,
+        "scores": scores,
+        "details": details,
+        "country": "Kenya"
+    }
@@ -806,7 +806,11 @@ function updateDashboard(data) {
     // Update location info
     const locationInfo = document.getElementById('locationInfo');
     if (locationInfo) {
-        locationInfo.innerHTML = `<i class="fas fa-map-pin"></i> ${regionName}`;
+        // Stale results are served from cache while the backend refreshes them;
+        // fallback/demo results are sample data, not Google Trends
+        const freshnessNotes = { stale: ' · cached, updating', fallback: ' · sample data', demo: ' · sample data' };
+        const freshnessNote = freshnessNotes[data.freshness] || '';
+        locationInfo.innerHTML = `<i class="fas fa-map-pin"></i> ${regionName}${freshnessNote}`;
     }
     
     // Update score colors
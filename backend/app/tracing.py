@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from .logging_config import create_queue_logger
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Lightweight request tracing. A sampled request carries a Trace in a context
+# variable; span() blocks anywhere below it (including concurrent tasks and
+# worker threads started from it) record their timings into that trace.
+# Unsampled requests skip all of this: span() is a single ContextVar lookup.
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+# Add a Server-Timing header (per-stage totals) to sampled responses
+TRACE_SERVER_TIMING = os.getenv("TRACE_SERVER_TIMING", "true").lower() == "true"
+# Append each sampled trace as one JSON line to this file (empty: don't export)
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "")
+
+_current_trace = ContextVar("trace", default=None)
+_current_span = ContextVar("span", default=None)
+
+_exporter = None
+if TRACE_EXPORT_FILE:
+    _exporter = create_queue_logger("app.tracing.export", logging.FileHandler(TRACE_EXPORT_FILE, encoding="utf-8"))
+    logger.info("Exporting sampled traces to %s", TRACE_EXPORT_FILE)
+
+
+class Trace:
+    """Spans recorded for one sampled request."""
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.wall_start = time.time()
+        self.started = time.perf_counter()
+        self.duration = None
+        # (name, parent name, offset from trace start, duration), all in seconds
+        self.spans = []
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+
+    def totals(self):
+        """Total time and call count per span name, in first-seen order."""
+        totals = {}
+        for name, _, _, duration in self.spans:
+            total = totals.setdefault(name, [0.0, 0])
+            total[0] += duration
+            total[1] += 1
+        return totals
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "start": datetime.fromtimestamp(self.wall_start, timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "spans": [
+                {"name": name, "parent": parent, "start_ms": round(offset * 1000, 3), "duration_ms": round(duration * 1000, 3)}
+                for name, parent, offset, duration in self.spans
+            ]
+        }
+
+
+@contextmanager
+def span(name: str):
+    """Time a block as a stage of the current trace (no-op when not sampled)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    parent = _current_span.get()
+    token = _current_span.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+        trace.spans.append((name, parent, started - trace.started, time.perf_counter() - started))
+
+
+def server_timing(trace: Trace):
+    """Server-Timing header value: one entry per span name plus the total so far."""
+    entries = []
+    for name, (duration, count) in trace.totals().items():
+        entry = f"{name};dur={duration * 1000:.1f}"
+        if count > 1:
+            entry += f';desc="{count} calls"'
+        entries.append(entry)
+    entries.append(f"total;dur={(time.perf_counter() - trace.started) * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def _export(trace: Trace):
+    if _exporter is not None:
+        _exporter.info(json.dumps(trace.to_dict()))
+
+
+async def detached(coro, name: str):
+    """
+    Run a coroutine outside the caller's trace, for work started from a
+    request that outlives or serves more than that request (shared fetches,
+    background refreshes, micro-batches). Wrap it before creating the task:
+    the task gets its own context, so the reset stays inside it. The work is
+    sampled as its own trace and exported, with no Server-Timing header.
+    """
+    trace = Trace(name) if TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE else None
+    _current_trace.set(trace)
+    _current_span.set(None)
+    try:
+        return await coro
+    finally:
+        if trace is not None:
+            trace.finish()
+            _export(trace)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware that samples requests, makes their Trace current for the
+    handler, adds a Server-Timing header and exports the finished trace.
+    """
+
+    def __init__(self, app, sample_rate: float = None):
+        self.app = app
+        self.sample_rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(f"{scope['method']} {scope['path']}")
+        token = _current_trace.set(trace)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and TRACE_SERVER_TIMING:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(trace).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            trace.finish()
+            _export(trace)
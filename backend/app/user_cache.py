@@ -0,0 +1,44 @@
+import os
+from dotenv import load_dotenv
+from . import models
+from .services.cache import TTLCache, register_cache_stats
+
+load_dotenv()
+
+# Authenticated users, keyed by user_id, so protected routes skip the DB lookup.
+# Entries are dropped explicitly whenever the user row changes.
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))  # seconds, default 5 minutes
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+_user_cache = TTLCache(ttl=USER_CACHE_TTL, max_entries=USER_CACHE_MAX_ENTRIES)
+register_cache_stats('users', _user_cache.stats)
+
+
+def _snapshot(user: models.User) -> models.User:
+    """
+    Copy a user's column values into a new, session-less User object.
+    The cached copy is never attached to a session, so a commit or close in
+    one request can't expire or detach what other requests are reading.
+    """
+    return models.User(**{
+        column.key: getattr(user, column.key)
+        for column in models.User.__table__.columns
+    })
+
+
+def get_cached_user(user_id: int):
+    """Return a read-only cached User, or None."""
+    return _user_cache.get(user_id)
+
+
+def cache_user(user: models.User) -> models.User:
+    snapshot = _snapshot(user)
+    _user_cache.set(user.id, snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id: int):
+    _user_cache.delete(user_id)
+
+
+def get_user_cache_stats():
+    return _user_cache.stats()
@@ -0,0 +1,102 @@
+"""
+Benchmark: sync Session vs AsyncSession inside async route handlers.
+
+Runs the login hot path (look up a user by email, update last_login,
+commit) N times concurrently with each session type. Meanwhile a
+probe task, standing in for in-flight trend requests, measures how long
+the event loop is frozen. With the sync Session every query and commit
+runs on the event loop thread. With AsyncSession the loop keeps serving
+other work.
+
+Uses a throwaway SQLite file. Run from the backend folder:
+    python -m benchmarks.bench_db_concurrency [concurrency]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.auth import hash_password
+
+USERS = 2000
+
+
+def seed(url: str):
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        password_hash = hash_password("benchmark")
+        db.add_all([
+            models.User(email=f"user{i}@example.com", username=f"user{i}", password_hash=password_hash, full_name="")
+            for i in range(USERS)
+        ])
+        db.commit()
+    return engine
+
+
+async def loop_lag_probe(stop: asyncio.Event, lags: list, interval: float = 0.005):
+    """Record how late each short sleep wakes up (event loop blocking)."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def run(label: str, login, concurrency: int):
+    lags = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(loop_lag_probe(stop, lags))
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[login(i % USERS) for i in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    print(f"{label:<14}{concurrency / elapsed:>10.0f}{elapsed * 1000:>12.0f}"
+          f"{max(lags, default=0) * 1000:>16.1f}{p99 * 1000:>14.1f}")
+
+
+async def main(concurrency: int):
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "bench.db")
+    sync_engine = seed(f"sqlite:///{path}")
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def sync_login(i):
+        # What the routes did before: blocking calls inside async def
+        with SyncSession() as db:
+            user = db.execute(select(models.User).where(models.User.email == f"user{i}@example.com")).scalars().first()
+            user.last_login = datetime.utcnow()
+            db.commit()
+
+    async def async_login(i):
+        async with AsyncSession() as db:
+            result = await db.execute(select(models.User).where(models.User.email == f"user{i}@example.com"))
+            user = result.scalars().first()
+            user.last_login = datetime.utcnow()
+            await db.commit()
+
+    print(f"{concurrency} concurrent logins against {USERS} users (SQLite)")
+    print(f"{'session':<14}{'ops/s':>10}{'total (ms)':>12}{'max lag (ms)':>16}{'p99 lag (ms)':>14}")
+    await run("sync", sync_login, concurrency)
+    await run("async", async_login, concurrency)
+    await async_engine.dispose()
+    sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,94 @@
+"""
+Query-plan check: case-insensitive email lookups on a large users table.
+
+Builds a throwaway SQLite database in the schema that predates email_lower,
+seeds it with users, and runs the migration (add column, backfill,
+unique index). Then, for each lookup:
+  - login before: email ILIKE :email
+  - login after: email_lower = :email
+  - register: email_lower = :email OR username = :username
+it prints the query plan and the mean lookup time.
+Exits non-zero if a new lookup still scans the table. The plan check
+alone also runs with the test suite (tests/test_email_lookup_plan.py).
+
+Run from the backend folder:
+    python -m benchmarks.bench_email_lookup [users]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from sqlalchemy import create_engine, select, text
+
+from app import models
+from app.migrations import run_migrations
+
+LEGACY_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY,
+    email VARCHAR,
+    username VARCHAR,
+    password_hash VARCHAR,
+    full_name VARCHAR,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    last_login DATETIME
+);
+CREATE INDEX ix_users_id ON users (id);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE UNIQUE INDEX ix_users_username ON users (username)
+"""
+
+
+def seed(engine, count: int):
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA.split(";"):
+            conn.execute(text(statement))
+        # Mixed-case addresses, as older clients stored them
+        conn.execute(
+            text("INSERT INTO users (email, username, password_hash, full_name) VALUES (:email, :username, 'x', '')"),
+            [{"email": f"User{i}@Example.com", "username": f"user{i}"} for i in range(count)]
+        )
+
+
+def plan(conn, statement):
+    sql = str(statement.compile(conn, compile_kwargs={"literal_binds": True}))
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+def main(count: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench_email.db")
+    engine = create_engine(f"sqlite:///{path}")
+    seed(engine, count)
+
+    started = timeit.default_timer()
+    run_migrations(engine)
+    print(f"Migration on {count} users: {(timeit.default_timer() - started) * 1000:.0f} ms\n")
+
+    target = f"user{count - 1}@example.com"
+    users = models.User.__table__
+    queries = [
+        ("login before", select(users).where(users.c.email.ilike(target)), False),
+        ("login after", select(users).where(users.c.email_lower == target), True),
+        ("register", select(users.c.email_lower).where(
+            (users.c.email_lower == target) | (users.c.username == f"user{count - 1}")
+        ), True),
+    ]
+
+    failures = 0
+    with engine.connect() as conn:
+        for label, statement, must_use_index in queries:
+            query_plan = plan(conn, statement)
+            runs = 20 if "SCAN" in query_plan else 2000
+            seconds = timeit.timeit(lambda: conn.execute(statement).fetchall(), number=runs) / runs
+            print(f"{label:<14}{seconds * 1e6:>10.1f} us   {query_plan}")
+            if must_use_index and ("SCAN" in query_plan or "INDEX" not in query_plan):
+                print(f"  FAIL: {label} does not use an index")
+                failures += 1
+    engine.dispose()
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000) else 0)
@@ -0,0 +1,72 @@
+"""
+Micro-benchmark: interest_over_time DataFrame -> [{"date", "value"}] points.
+
+Compares the old per-row iterrows() conversion with the column-wise
+_frame_to_series used by get_historical_trends, on frame sizes pytrends
+actually returns.
+
+Run from the backend folder:
+    python -m benchmarks.bench_series_conversion
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from app.services.google_trends_service import _frame_to_series
+
+# (label, periods, freq) - sizes of real pytrends responses
+FRAME_SIZES = [
+    ("today 12-m (weekly)", 52, "W"),
+    ("today 3-m (daily)", 90, "D"),
+    ("today 5-y (weekly)", 261, "W"),
+    ("269 days (daily)", 269, "D"),
+]
+
+
+def make_frame(kv: str, periods: int, freq: str):
+    dates = pd.date_range("2024-01-07", periods=periods, freq=freq, name="date")
+    rng = np.random.default_rng(42)
+    values = rng.integers(0, 101, size=periods)
+    values[rng.random(periods) < 0.1] = 0  # some empty weeks, as Google returns
+    return pd.DataFrame({kv: values, "isPartial": False}, index=dates)
+
+
+def legacy_iterrows(interest_over_time_df, kv: str, keyword: str):
+    """The per-row conversion get_historical_trends used before vectorizing."""
+    interest_over_time_df = interest_over_time_df.reset_index()
+    historical_data = []
+    for _, row in interest_over_time_df.iterrows():
+        col_name = kv if kv in interest_over_time_df.columns else keyword
+        value = None
+        try:
+            value = int(row[col_name]) if col_name in row and row[col_name] is not None else None
+        except Exception:
+            cols = [c for c in interest_over_time_df.columns if c != 'date']
+            if cols:
+                try:
+                    value = int(row[cols[0]])
+                except Exception:
+                    value = None
+        if value and value > 0:
+            historical_data.append({
+                "date": row['date'].strftime('%Y-%m-%d'),
+                "value": value
+            })
+    return historical_data
+
+
+def main(number: int = 200):
+    kv = "maize"
+    print(f"{'frame':<22}{'rows':>6}{'iterrows (ms)':>16}{'vectorized (ms)':>18}{'speedup':>10}")
+    for label, periods, freq in FRAME_SIZES:
+        df = make_frame(kv, periods, freq)
+        assert legacy_iterrows(df, kv, kv) == _frame_to_series(df, kv, kv)
+
+        legacy = timeit.timeit(lambda: legacy_iterrows(df, kv, kv), number=number) / number * 1000
+        vectorized = timeit.timeit(lambda: _frame_to_series(df, kv, kv), number=number) / number * 1000
+        print(f"{label:<22}{periods:>6}{legacy:>16.3f}{vectorized:>18.3f}{legacy / vectorized:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
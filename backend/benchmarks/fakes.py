@@ -0,0 +1,138 @@
+"""
+Local stand-ins for the upstream APIs, used by the load test.
+
+FakeTrendReq replaces pytrends' TrendReq inside the app process, and
+FakeSerperServer is an HTTP server that answers like Serper's /search.
+Both have configurable latency, generic error rate and 429 rate, so the
+retry, rate-limit and fallback paths get exercised too.
+"""
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+
+def _latency(mean_ms: float):
+    # Long-tailed like real upstreams: lognormal around the configured mean
+    if mean_ms <= 0:
+        return 0.0
+    return random.lognormvariate(0, 0.5) * mean_ms / 1000 / 1.133
+
+
+class FakeTrendReq:
+    """
+    Drop-in for pytrends.request.TrendReq. Configured through environment
+    variables so it works in the app's server process:
+    FAKE_TRENDS_LATENCY_MS, FAKE_TRENDS_ERROR_RATE, FAKE_TRENDS_429_RATE.
+    """
+
+    latency_ms = float(os.getenv("FAKE_TRENDS_LATENCY_MS", "300"))
+    error_rate = float(os.getenv("FAKE_TRENDS_ERROR_RATE", "0.02"))
+    rate_limit_rate = float(os.getenv("FAKE_TRENDS_429_RATE", "0.01"))
+
+    def __init__(self, *args, **kwargs):
+        self.keywords = []
+        self.timeframe = "today 12-m"
+
+    def build_payload(self, kw_list, cat=0, timeframe="today 12-m", geo="", gprop=""):
+        self.keywords = list(kw_list)
+        self.timeframe = timeframe
+
+    def interest_over_time(self):
+        time.sleep(_latency(self.latency_ms))
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            raise Exception("The request failed: Google returned a response with code 429")
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise Exception("The request failed: Google returned a response with code 500")
+
+        if self.timeframe == "today 3-m":
+            dates = pd.date_range(end=pd.Timestamp.today().normalize(), periods=90, freq="D")
+        else:
+            dates = pd.date_range(end=pd.Timestamp.today().normalize(), periods=52, freq="W")
+        data = {}
+        for keyword in self.keywords:
+            # Stable per-keyword shape so repeated fetches agree
+            rng = np.random.default_rng(zlib.crc32(keyword.encode()))
+            data[keyword] = rng.integers(5, 101, size=len(dates))
+        data["isPartial"] = False
+        return pd.DataFrame(data, index=pd.Index(dates, name="date"))
+
+
+class _SerperHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("content-length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(_latency(server.latency_ms))
+
+        roll = random.random()
+        if roll < server.rate_limit_rate:
+            status, payload = 429, {"message": "Too many requests"}
+        elif roll < server.rate_limit_rate + server.error_rate:
+            status, payload = 500, {"message": "Internal error"}
+        else:
+            status = 200
+            organic = random.randint(3, 10)
+            payload = {
+                "searchParameters": {"q": body.get("q"), "gl": body.get("gl")},
+                "organic": [
+                    {"title": f"{body.get('q')} result {i}", "link": f"https://example.com/{i}", "position": i + 1}
+                    for i in range(organic)
+                ]
+            }
+        server.record(status)
+
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeSerperServer(ThreadingHTTPServer):
+    """Serper-compatible /search endpoint on localhost, run in a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency_ms: float = 150, error_rate: float = 0.01, rate_limit_rate: float = 0.0):
+        super().__init__(("127.0.0.1", port), _SerperHandler)
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.counts = {}
+        self._counts_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/search"
+
+    def record(self, status: int):
+        with self._counts_lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+
+    def snapshot(self):
+        with self._counts_lock:
+            return dict(self.counts)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,20 @@
+"""
+Run the API with pytrends replaced by benchmarks.fakes.FakeTrendReq.
+Started by benchmarks.load_test in a subprocess; configure it with the
+FAKE_TRENDS_* variables and the app's usual environment variables.
+
+    python -m benchmarks.load_server [port]
+"""
+import sys
+
+import uvicorn
+
+from benchmarks.fakes import FakeTrendReq
+from app.services import google_trends_service
+
+google_trends_service.TrendReq = FakeTrendReq
+google_trends_service.USE_DEMO_DATA = False
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    uvicorn.run("app.main:app", host="127.0.0.1", port=port, log_level="warning")
@@ -0,0 +1,277 @@
+"""
+Load test: throughput and latency of the API against local upstream stand-ins.
+
+Starts a fake Serper server (benchmarks.fakes.FakeSerperServer) and the app
+in a subprocess with pytrends replaced by FakeTrendReq (benchmarks.load_server),
+on a throwaway SQLite database. It then registers a pool of users and drives,
+one scenario at a time:
+  - trends: GET /trends/{keyword}?region=...
+  - api_trends: GET /api/trends/{keyword} with a bearer token
+  - login: POST /auth/login
+Keywords follow a Zipf distribution over the sector vocabulary (a few hot
+terms, a long tail) and regions a weighted mix, so cache hit rates look like
+production rather than one key hammered or every key cold.
+
+For each scenario it prints RPS, p50/p95/p99 and the upstream calls made
+(from /metrics and the fake Serper's own counts), and writes everything as
+JSON to benchmarks/results/load_<commit>.json. Pass --baseline with an
+earlier result file to print the change per scenario.
+
+Run from the backend folder:
+    python -m benchmarks.load_test [--duration 20] [--concurrency 50] [--baseline FILE]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from app.services.keyword_classifier import get_sector_vocabulary
+from benchmarks.fakes import FakeSerperServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+# Share of traffic per region: mostly national queries, then the big cities
+REGION_WEIGHTS = {"KE": 0.5, "Nairobi": 0.25, "Mombasa": 0.12, "Kisumu": 0.08, "Nakuru": 0.05}
+
+SCENARIOS = ("trends", "api_trends", "login")
+
+UPSTREAM_COUNT = re.compile(r'^twoknow_upstream_request_seconds_count\{upstream="(\w+)",outcome="(\w+)"\} (\d+)', re.M)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of %s" % ", ".join(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=20, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent clients")
+    parser.add_argument("--users", type=int, default=50, help="accounts registered for login/api_trends")
+    parser.add_argument("--zipf", type=float, default=1.1, help="keyword popularity skew (0 = uniform)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--trends-latency-ms", type=float, default=300)
+    parser.add_argument("--trends-error-rate", type=float, default=0.02)
+    parser.add_argument("--trends-429-rate", type=float, default=0.01)
+    parser.add_argument("--serper-latency-ms", type=float, default=150)
+    parser.add_argument("--serper-error-rate", type=float, default=0.01)
+    parser.add_argument("--serper-429-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/load_<commit>.json)")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    return parser.parse_args()
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def keyword_sampler(rng: random.Random, skew: float):
+    """Draw keywords with Zipf-distributed popularity from the sector vocabulary."""
+    terms = sorted({term for sector in get_sector_vocabulary().values() for term in sector["sectors"]})
+    rng.shuffle(terms)
+    weights = [1 / (rank ** skew) for rank in range(1, len(terms) + 1)]
+    regions, region_weights = list(REGION_WEIGHTS), list(REGION_WEIGHTS.values())
+
+    def sample():
+        return rng.choices(terms, weights)[0], rng.choices(regions, region_weights)[0]
+
+    return sample
+
+
+def percentile(sorted_values, q: float):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def start_server(args, serper_url: str, db_path: str):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        SERPER_API_KEY="loadtest",
+        SERPER_API_URL=serper_url,
+        FAKE_TRENDS_LATENCY_MS=str(args.trends_latency_ms),
+        FAKE_TRENDS_ERROR_RATE=str(args.trends_error_rate),
+        FAKE_TRENDS_429_RATE=str(args.trends_429_rate),
+        # The fake has no real quota; keep the limiter and backoff from dominating
+        TRENDS_QPS=os.getenv("TRENDS_QPS", "20"),
+        TRENDS_BURST=os.getenv("TRENDS_BURST", "20"),
+        TRENDS_BACKOFF_BASE=os.getenv("TRENDS_BACKOFF_BASE", "0.1"),
+        WARMER_ENABLED="false",
+        TRENDS_STORE_ENABLED="false",
+        # Injected failures are expected; only show what the app cannot handle
+        LOG_LEVEL=os.getenv("LOG_LEVEL", "CRITICAL"),
+        TRACE_SAMPLE_RATE="0"
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.load_server", str(args.port)],
+        cwd=BACKEND_DIR, env=env
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"App exited with code {server.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("App did not become ready")
+
+
+async def register_users(client: httpx.AsyncClient, count: int):
+    users = []
+    for i in range(count):
+        credentials = {"email": f"load{i}@example.com", "password": "loadtest-password"}
+        response = await client.post("/auth/register", json={**credentials, "username": f"load{i}"})
+        response.raise_for_status()
+        users.append((credentials, response.json()["access_token"]))
+    return users
+
+
+async def upstream_counts(client: httpx.AsyncClient):
+    text = (await client.get("/metrics")).text
+    return {f"{upstream}:{outcome}": int(count) for upstream, outcome, count in UPSTREAM_COUNT.findall(text)}
+
+
+async def run_scenario(name, client, args, sample, users, rng):
+    latencies = []
+    statuses = {}
+
+    async def one_request():
+        if name == "login":
+            credentials, _ = rng.choice(users)
+            return await client.post("/auth/login", json=credentials)
+        keyword, region = sample()
+        if name == "trends":
+            return await client.get(f"/trends/{keyword}", params={"region": region})
+        _, token = rng.choice(users)
+        return await client.get(f"/api/trends/{keyword}", headers={"Authorization": f"Bearer {token}"})
+
+    async def worker(deadline):
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                status = (await one_request()).status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker(started + args.duration) for _ in range(args.concurrency)))
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    ok = sum(count for status, count in statuses.items() if status == 200)
+    return {
+        "requests": len(latencies),
+        "errors": len(latencies) - ok,
+        "statuses": {str(status): count for status, count in statuses.items()},
+        "rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+            **{f"p{q}": round(percentile(latencies, q) * 1000, 2) if latencies else None for q in (50, 95, 99)}
+        }
+    }
+
+
+def diff(after: dict, before: dict):
+    return {key: after[key] - before.get(key, 0) for key in after if after[key] - before.get(key, 0)}
+
+
+def print_scenario(name, result):
+    latency = result["latency_ms"]
+    print(
+        f"{name:<11}{result['requests']:>8} req {result['errors']:>6} err {result['rps']:>9.1f} rps"
+        f"   p50 {latency['p50']:>8.1f}   p95 {latency['p95']:>8.1f}   p99 {latency['p99']:>8.1f} ms"
+    )
+    print(f"{'':<11}upstream calls: {result['upstream_calls'] or 'none'}")
+
+
+def print_comparison(results, baseline):
+    print(f"\nChange vs {baseline['commit']} ({baseline['timestamp']}):")
+    for name, result in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before:
+            continue
+        changes = []
+        for label, now, then in [
+            ("rps", result["rps"], before["rps"]),
+            *((q, result["latency_ms"][q], before["latency_ms"][q]) for q in ("p50", "p95", "p99"))
+        ]:
+            if now is not None and then:
+                changes.append(f"{label} {(now - then) / then * 100:+.1f}%")
+        print(f"  {name:<11}" + "   ".join(changes))
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    sample = keyword_sampler(rng, args.zipf)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    serper = FakeSerperServer(
+        latency_ms=args.serper_latency_ms, error_rate=args.serper_error_rate, rate_limit_rate=args.serper_429_rate
+    ).start()
+    db_dir = tempfile.mkdtemp()
+    server = start_server(args, serper.url, os.path.join(db_dir, "load.db"))
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "scenarios": {}
+    }
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+            await wait_ready(client, server)
+            users = await register_users(client, args.users) if {"login", "api_trends"} & set(scenarios) else []
+
+            for name in scenarios:
+                upstream_before, serper_before = await upstream_counts(client), serper.snapshot()
+                result = await run_scenario(name, client, args, sample, users, rng)
+                result["upstream_calls"] = diff(await upstream_counts(client), upstream_before)
+                result["fake_serper_responses"] = {str(k): v for k, v in diff(serper.snapshot(), serper_before).items()}
+                results["scenarios"][name] = result
+                print_scenario(name, result)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        serper.stop()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load_{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            print_comparison(results, json.load(f))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -25,7 +25,10 @@ if __name__ == "__main__":
     print("  POST /auth/login          - Login user")
     print("  GET  /auth/profile        - User profile")
     print("  GET  /trends/{keyword}    - Public trends")
+    print("  POST /trends/batch        - Batch trends (NDJSON)")
+    print("  GET  /trends/compare/regions - Keyword x region scores")
     print("  GET  /api/trends/{keyword}- Protected trends")
+    print("  GET  /metrics             - Prometheus metrics")
     print("\n🔑 Required in .env:")
     print("  JWT_SECRET_KEY, SERPER_API_KEY, DATABASE_URL, ALLOWED_ORIGINS")
     print("="*60 + "\n")
@@ -0,0 +1,8 @@
+"""
+Point the app at a throwaway SQLite file before anything imports
+app.database, so tests never touch the development database.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
@@ -0,0 +1,71 @@
+"""
+In-memory TTL/LRU cache.
+Run from the backend folder: python -m pytest tests
+"""
+import asyncio
+
+from app.services.cache import MemoryCacheBackend, TTLCache
+
+
+def test_peek_leaves_lru_order_and_stats_alone():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.peek("a") == 1 and cache.peek("missing") is None
+    cache.set("c", 3)
+
+    # "a" was only peeked at, so it is still the least recently used
+    assert cache.get("a") is None and cache.get("b") == 2
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_memory_backend_peek_is_not_counted():
+    backend = MemoryCacheBackend(ttl=60, max_entries=10)
+
+    async def scenario():
+        await backend.set("key", {"ts": 1})
+        return await backend.peek("key"), await backend.peek("other")
+
+    assert asyncio.run(scenario()) == ({"ts": 1}, None)
+    assert backend.stats()["hits"] == 0 and backend.stats()["misses"] == 0
+
+
+def test_expired_entries_are_misses_and_swept(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.cache.time.time", lambda: now[0])
+    cache = TTLCache(ttl=10, max_entries=10)
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2)
+
+    now[0] += 6
+    assert cache.get("short") is None and cache.get("long") == 2
+    now[0] += 5
+    assert cache.sweep_expired() == 1
+    assert len(cache) == 0 and cache.stats()["expirations"] == 2
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = TTLCache(ttl=60, max_entries=3)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    cache.get("a")
+    cache.set("d", "d")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_evicts_but_keeps_the_newest_entry():
+    cache = TTLCache(ttl=60, max_entries=100, max_bytes=250)
+    for i in range(5):
+        cache.set(i, "x" * 100)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["approx_bytes"] <= 250
+    assert cache.get(4) is not None and cache.get(0) is None
+
+    cache.set("huge", "x" * 1000)
+    assert len(cache) == 1 and cache.get("huge") is not None
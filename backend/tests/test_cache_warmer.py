@@ -0,0 +1,96 @@
+"""
+Cache warmer: decaying popularity and which entries a cycle refreshes.
+Run from the backend folder: python -m pytest tests
+"""
+import asyncio
+
+import pytest
+
+from app.services import cache_warmer
+from app.services import google_trends_service as gts
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache_warmer.time, "time", lambda: now[0])
+    monkeypatch.setattr(cache_warmer, "_popularity", {})
+    monkeypatch.setattr(cache_warmer, "WARMER_HALF_LIFE", 100.0)
+    return now
+
+
+def test_popularity_halves_every_half_life(clock):
+    for _ in range(4):
+        cache_warmer.record_request("Maize ", "KE")
+    clock[0] += 100
+    cache_warmer.record_request("maize", "KE")
+    clock[0] += 100
+
+    [(keyword, region, score)] = cache_warmer.top_keywords()
+    # (4 / 2 + 1) / 2
+    assert (keyword, region) == ("Maize", "KE") and score == pytest.approx(1.5)
+
+
+def test_recent_traffic_outranks_old_traffic(clock):
+    for _ in range(8):
+        cache_warmer.record_request("old favourite", "KE")
+    clock[0] += 400  # 8 -> 0.5
+    cache_warmer.record_request("new", "Nairobi")
+
+    assert [(k, r) for k, r, _ in cache_warmer.top_keywords()] == [("new", "Nairobi"), ("old favourite", "KE")]
+
+
+def test_pruning_drops_the_least_popular_half(clock, monkeypatch):
+    monkeypatch.setattr(cache_warmer, "WARMER_MAX_TRACKED", 4)
+    cache_warmer.record_request("faded", "KE")
+    clock[0] += 100
+    for keyword, hits in [("top", 5), ("second", 4), ("third", 2)]:
+        for _ in range(hits):
+            cache_warmer.record_request(keyword, "KE")
+    # Fifth key: the two lowest (faded at 0.5, newcomer at 1) are dropped
+    cache_warmer.record_request("newcomer", "KE")
+
+    assert [k for k, _, _ in cache_warmer.top_keywords()] == ["top", "second", "third"]
+
+
+def test_cycle_refreshes_popular_entries_near_expiry_within_budget(clock, monkeypatch):
+    for keyword, hits in [("expiring", 5), ("fresh", 4), ("missing", 3), ("over budget", 2)]:
+        for _ in range(hits):
+            cache_warmer.record_request(keyword, "KE")
+    ages = {"expiring": 590.0, "fresh": 10.0, "missing": None, "over budget": None}
+    refreshed = []
+
+    async def get_cache_age(keyword, region="KE"):
+        return ages[keyword]
+
+    async def refresh(keyword, region="KE"):
+        refreshed.append(keyword)
+        return [{"date": "2026-01-04", "value": 1}]
+
+    monkeypatch.setattr(gts, "get_cache_age", get_cache_age)
+    monkeypatch.setattr(gts, "refresh_historical_trends", refresh)
+    monkeypatch.setattr(gts, "rate_budget_available", lambda: 10)
+    monkeypatch.setattr(gts, "circuit_open", lambda: False)
+    monkeypatch.setattr(gts, "CACHE_TTL", 600)
+    monkeypatch.setattr(cache_warmer, "WARMER_LEAD_TIME", 120)
+    # Budget per cycle: 1 QPS x 4s interval x 0.5 share = 2 refreshes
+    monkeypatch.setattr(gts, "TRENDS_QPS", 1.0)
+    monkeypatch.setattr(cache_warmer, "WARMER_INTERVAL", 4)
+
+    assert asyncio.run(cache_warmer.warm_once()) == 2
+    assert refreshed == ["expiring", "missing"]
+
+
+def test_cycle_stops_while_the_circuit_is_open(clock, monkeypatch):
+    cache_warmer.record_request("anything", "KE")
+
+    async def never_cached(keyword, region="KE"):
+        return None
+
+    monkeypatch.setattr(gts, "get_cache_age", never_cached)
+    monkeypatch.setattr(gts, "rate_budget_available", lambda: 10)
+    monkeypatch.setattr(gts, "circuit_open", lambda: True)
+    skipped = cache_warmer._stats["skipped_circuit"]
+
+    assert asyncio.run(cache_warmer.warm_once()) == 0
+    assert cache_warmer._stats["skipped_circuit"] == skipped + 1
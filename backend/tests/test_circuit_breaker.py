@@ -0,0 +1,96 @@
+"""
+Upstream circuit breaker.
+Run from the backend folder: python -m pytest tests
+"""
+import asyncio
+
+import pytest
+
+from app.services import google_trends_service as gts
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.rate_limiter import TokenBucket
+
+
+def _breaker(**overrides):
+    options = dict(failure_threshold=2, rate_limit_threshold=1, open_seconds=60, max_open_seconds=600)
+    options.update(overrides)
+    return CircuitBreaker("test", **options)
+
+
+def test_open_circuit_refuses_before_taking_a_rate_limit_token(monkeypatch):
+    breaker = _breaker()
+    breaker.record('rate_limited')
+    bucket = TokenBucket(rate=0.001, burst=1)
+    monkeypatch.setattr(gts, "_circuit", breaker)
+    monkeypatch.setattr(gts, "_rate_limiter", bucket)
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(gts._query_solo("refused", "today 12-m", "KE"))
+
+    assert bucket.stats()['acquired'] == 0 and bucket.stats()['tokens_available'] >= 1
+    assert breaker.stats()['rejected'] == 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("app.services.circuit_breaker.time", clock)
+    return clock
+
+
+def test_failures_open_then_probe_closes(clock):
+    breaker = _breaker()
+    breaker.record('error')
+    assert breaker.allow() and breaker.state == 'closed'
+
+    breaker.record('error')
+    assert breaker.state == 'open' and not breaker.allow()
+
+    clock.now += 60
+    assert breaker.allow() and breaker.state == 'half_open'
+    # Only one probe at a time
+    assert not breaker.allow()
+
+    breaker.record('ok')
+    assert breaker.state == 'closed' and breaker.allow()
+    assert breaker.stats()['consecutive_failures'] == 0
+    assert breaker.stats()['opened'] == 1 and breaker.stats()['probes'] == 1
+
+
+def test_failed_probe_reopens_for_twice_as_long(clock):
+    breaker = _breaker(open_seconds=60, max_open_seconds=200)
+    breaker.record('rate_limited')
+    clock.now += 60
+
+    for expected in (120, 200, 200):
+        assert breaker.allow()
+        breaker.record('rate_limited')
+        assert breaker.state == 'open' and breaker.open_seconds == expected
+        clock.now += expected - 1
+        assert not breaker.allow()
+        clock.now += 1
+
+    assert breaker.allow()
+    breaker.record('ok')
+    assert breaker.open_seconds == 60
+
+
+def test_unreported_probe_is_given_up_after_an_open_period(clock):
+    breaker = _breaker()
+    breaker.record('rate_limited')
+    clock.now += 60
+    assert breaker.allow()
+
+    clock.now += 59
+    assert breaker.refuse_early() and not breaker.allow()
+    clock.now += 1
+    assert not breaker.refuse_early() and breaker.allow()
+    assert breaker.stats()['probes'] == 2
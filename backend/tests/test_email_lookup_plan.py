@@ -0,0 +1,68 @@
+"""
+Login and register must look users up through the email_lower index.
+Run from the backend folder: python -m pytest tests
+"""
+import pytest
+from sqlalchemy import create_engine, select, text
+
+from app import models
+from app.migrations import run_migrations
+from benchmarks.bench_email_lookup import plan, seed
+
+USERS = 500
+
+
+def _create_legacy(engine):
+    seed(engine, USERS)
+
+
+def _create_current(engine):
+    models.Base.metadata.create_all(bind=engine, tables=[models.User.__table__])
+
+
+@pytest.fixture(params=[_create_legacy, _create_current], ids=["migrated", "fresh"])
+def engine(request, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    request.param(engine)
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_login_lookup_uses_email_lower_index(engine):
+    users = models.User.__table__
+    statement = select(users).where(users.c.email_lower == models.normalize_email(" User7@Example.com"))
+
+    with engine.connect() as conn:
+        query_plan = plan(conn, statement)
+
+    assert "ix_users_email_lower" in query_plan and "SCAN" not in query_plan
+
+
+def test_register_lookup_uses_email_lower_index(engine):
+    users = models.User.__table__
+    statement = select(users.c.email_lower).where(
+        (users.c.email_lower == "user7@example.com") | (users.c.username == "someone-else")
+    )
+
+    with engine.connect() as conn:
+        query_plan = plan(conn, statement)
+
+    assert "ix_users_email_lower" in query_plan and "SCAN" not in query_plan
+
+
+def test_backfill_folds_non_ascii_case(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    seed(engine, 1)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (email, username, password_hash, full_name) VALUES (' ÉLODIE@Example.com', 'elodie', 'x', '')"))
+
+    run_migrations(engine)
+
+    users = models.User.__table__
+    with engine.connect() as conn:
+        found = conn.execute(
+            select(users.c.username).where(users.c.email_lower == models.normalize_email("élodie@example.com"))
+        ).scalar()
+    engine.dispose()
+    assert found == "elodie"
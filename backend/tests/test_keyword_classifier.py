@@ -0,0 +1,48 @@
+"""
+Compiled keyword classifier (Aho-Corasick over every sector term).
+Run from the backend folder: python -m pytest tests
+"""
+from app.services.keyword_classifier import KeywordClassifier, classify_keyword
+
+SECTORS = [
+    {"name": "food", "terms": ["rice", "he"], "markets": ["Food Market"]},
+    {"name": "tech", "terms": ["hers", "she", "phone", "smart phone"], "markets": ["Tech Street"]},
+]
+
+
+def _classifier():
+    return KeywordClassifier(SECTORS, default_sector="General", default_markets=["Anywhere"])
+
+
+def test_matches_whole_words_only():
+    classifier = _classifier()
+
+    assert classifier.classify("rice price") == ("Food", ["Food Market"])
+    # "rice" inside "price" and "phone" inside "phones" are not words of their own
+    assert classifier.classify("price of phones") == ("General", ["Anywhere"])
+
+
+def test_earlier_sector_wins_over_later_matches():
+    classifier = _classifier()
+
+    assert classifier.classify("smart phone or rice") == ("Food", ["Food Market"])
+    assert classifier.classify("smart phone") == ("Tech", ["Tech Street"])
+
+
+def test_overlapping_terms_found_through_failure_links():
+    classifier = _classifier()
+
+    # "he" only occurs inside "she" and "hers"; both need the suffix links
+    assert classifier.best_match("ushers") is None
+    assert classifier.best_match("she") == 1
+    assert classifier.best_match("hers he") == 0
+    assert classifier.term_count == 6
+
+
+def test_shipped_vocabulary_and_normalization():
+    assert classify_keyword("  Maize Flour ")[0] == "Agriculture"
+    assert classify_keyword("car parts")[0] == "Automotive"
+    sector, markets = classify_keyword("iphone 15")
+    markets.append("mutated")
+    # Cached results are copied out, so callers can't corrupt them
+    assert "mutated" not in classify_keyword("iphone 15")[1]
@@ -0,0 +1,83 @@
+"""
+Write-behind last_login updates.
+Run from the backend folder: python -m pytest tests
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app import login_tracker, models
+from app.database import SessionLocal, engine
+from app.user_cache import cache_user, get_cached_user
+
+
+@pytest.fixture
+def users():
+    models.Base.metadata.create_all(bind=engine, tables=[models.User.__table__])
+    db = SessionLocal()
+    created = [models.User(email=f"tracker{i}@example.com", username=f"tracker{i}", password_hash="x") for i in range(3)]
+    db.add_all(created)
+    db.commit()
+    ids = [user.id for user in created]
+    db.close()
+    yield ids
+    db = SessionLocal()
+    db.query(models.User).filter(models.User.id.in_(ids)).delete()
+    db.commit()
+    db.close()
+
+
+def _last_logins(ids):
+    db = SessionLocal()
+    try:
+        return {user.id: user.last_login for user in db.query(models.User).filter(models.User.id.in_(ids))}
+    finally:
+        db.close()
+
+
+def test_flush_writes_pending_logins_in_one_batch(users):
+    flushes = login_tracker._stats["flushes"]
+    when = datetime(2026, 10, 1, 8, 30)
+    db = SessionLocal()
+    cache_user(db.get(models.User, users[0]))
+    db.close()
+    for user_id in users:
+        login_tracker.record_login(user_id, when)
+
+    # Readers see the pending login before it is written
+    assert login_tracker.last_login_for(models.User(id=users[0])) == when
+    assert asyncio.run(login_tracker.flush()) == 3
+
+    assert login_tracker._stats["flushes"] == flushes + 1
+    assert set(_last_logins(users).values()) == {when}
+    assert get_cached_user(users[0]) is None
+    assert not login_tracker._pending
+
+
+def test_deleted_user_does_not_fail_the_batch(users):
+    login_tracker.record_login(users[0], datetime(2026, 10, 2))
+    login_tracker.record_login(-1, datetime(2026, 10, 2))
+
+    assert asyncio.run(login_tracker.flush()) == 1
+    assert _last_logins(users)[users[0]] == datetime(2026, 10, 2)
+
+
+def test_full_batch_is_flushed_without_waiting_for_the_interval(users, monkeypatch):
+    monkeypatch.setattr(login_tracker, "LOGIN_FLUSH_INTERVAL_MS", 60_000)
+    monkeypatch.setattr(login_tracker, "LOGIN_FLUSH_BATCH_SIZE", 3)
+
+    async def scenario():
+        login_tracker.start_login_tracker()
+        try:
+            for user_id in users:
+                login_tracker.record_login(user_id, datetime(2026, 10, 3))
+            for _ in range(100):
+                if not login_tracker._pending:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await login_tracker.stop_login_tracker()
+
+    asyncio.run(scenario())
+    assert set(_last_logins(users).values()) == {datetime(2026, 10, 3)}
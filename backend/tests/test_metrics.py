@@ -0,0 +1,71 @@
+"""
+/metrics output in the Prometheus text exposition format.
+Run from the backend folder: python -m pytest tests
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.main import app
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Render only the metrics a test registers."""
+    monkeypatch.setattr(metrics, "_registry", {})
+    monkeypatch.setattr(metrics, "_callbacks", [])
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = metrics.histogram("test_seconds", "Test latency.", labels=("route",), buckets=(0.1, 1.0, 0.5))
+    for value in (0.05, 0.3, 0.3, 0.7, 4):
+        latency.observe(value, route="/a")
+
+    assert metrics.render().splitlines() == [
+        "# HELP test_seconds Test latency.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{route="/a",le="0.1"} 1',
+        'test_seconds_bucket{route="/a",le="0.5"} 3',
+        'test_seconds_bucket{route="/a",le="1"} 4',
+        'test_seconds_bucket{route="/a",le="+Inf"} 5',
+        'test_seconds_sum{route="/a"} 5.35',
+        'test_seconds_count{route="/a"} 5',
+    ]
+
+
+def test_label_values_are_escaped(registry):
+    errors = metrics.counter("test_errors_total", "Test errors.", labels=("reason",))
+    errors.inc(reason='bad "quote"\\path\nline')
+
+    assert 'test_errors_total{reason="bad \\"quote\\"\\\\path\\nline"} 1' in metrics.render().splitlines()
+
+
+def test_wrong_labels_are_rejected(registry):
+    gauge = metrics.gauge("test_depth", "Test depth.", labels=("queue",))
+
+    with pytest.raises(ValueError):
+        gauge.set(3, route="/a")
+
+
+def test_failing_callback_does_not_break_the_scrape(registry):
+    metrics.counter("test_total", "Test count.").inc(2)
+    metrics.register_callback("test_entries", "gauge", "Cache entries.", ("cache",), lambda: [(("users",), 7)])
+    metrics.register_callback("test_broken", "gauge", "Broken.", (), lambda: 1 / 0)
+
+    lines = metrics.render().splitlines()
+
+    assert "test_total 2" in lines
+    assert "# TYPE test_entries gauge" in lines and 'test_entries{cache="users"} 7' in lines
+    assert not any("test_broken" in line for line in lines)
+
+
+def test_endpoint_serves_text_format_with_route_templates():
+    client = TestClient(app)
+    client.get("/debug/users", params={"limit": 1})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE twoknow_http_request_seconds histogram" in response.text
+    assert 'route="/debug/users",status="200",le="+Inf"}' in response.text
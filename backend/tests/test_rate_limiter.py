@@ -0,0 +1,32 @@
+"""Run from the backend folder: python -m pytest tests"""
+import asyncio
+
+import pytest
+
+from app.services.rate_limiter import RateLimitWaitExceeded, TokenBucket
+
+
+def test_acquire_refuses_callers_queued_past_max_wait():
+    async def scenario():
+        # One token every 0.1s; a fourth caller would wait ~0.3s
+        bucket = TokenBucket(rate=10, burst=1, max_wait=0.25)
+        queued = [asyncio.ensure_future(bucket.acquire()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert bucket.backlogged()
+        with pytest.raises(RateLimitWaitExceeded):
+            await bucket.acquire()
+        waits = await asyncio.gather(*queued)
+        return bucket, waits
+
+    bucket, waits = asyncio.run(scenario())
+    assert max(waits) < 0.25
+    assert bucket.stats()['refused'] == 1 and bucket.stats()['waiting'] == 0
+
+
+def test_acquire_without_max_wait_always_queues():
+    async def scenario():
+        bucket = TokenBucket(rate=100, burst=1)
+        await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+        return bucket
+
+    assert asyncio.run(scenario()).stats()['acquired'] == 5
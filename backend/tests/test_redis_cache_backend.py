@@ -0,0 +1,131 @@
+"""
+RedisCacheBackend against a minimal in-process RESP server.
+Run from the backend folder: python -m pytest tests
+"""
+import asyncio
+
+from app.services.cache import RedisCacheBackend
+
+
+class FakeRedis:
+    """Understands GET, SET (PX ignored) and DEL; can drop every client like a restart."""
+
+    def __init__(self):
+        self.data = {}
+        self.connections = 0
+        self._writers = set()
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, '127.0.0.1', 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.drop_clients()
+        self._server.close()
+        await self._server.wait_closed()
+
+    def drop_clients(self):
+        for writer in self._writers:
+            writer.close()
+        self._writers.clear()
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                args = await self._read_command(reader)
+                writer.write(self._reply(args))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            writer.close()
+
+    @staticmethod
+    async def _read_command(reader):
+        count = int((await reader.readuntil(b'\r\n'))[1:-2])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readuntil(b'\r\n'))[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _reply(self, args):
+        command = args[0].upper()
+        if command == b'GET':
+            value = self.data.get(args[1])
+            return b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+        if command == b'SET':
+            self.data[args[1]] = args[2]
+            return b'+OK\r\n'
+        if command == b'DEL':
+            return b':%d\r\n' % (self.data.pop(args[1], None) is not None)
+        return b'-ERR unknown command\r\n'
+
+
+def _run(scenario):
+    async def main():
+        server = FakeRedis()
+        port = await server.start()
+        backend = RedisCacheBackend('test', ttl=60, url=f'redis://127.0.0.1:{port}/0')
+        try:
+            return await scenario(server, backend)
+        finally:
+            await backend.close()
+            await server.stop()
+    return asyncio.run(main())
+
+
+def test_round_trip_reuses_one_connection():
+    long_value = [{"date": f"2026-01-{day:02d}", "value": day} for day in range(1, 29)]
+
+    async def scenario(server, backend):
+        await backend.set('short', {'a': 1})
+        await backend.set('long', long_value)
+        assert await backend.get('short') == {'a': 1}
+        assert await backend.get('long') == long_value
+        await backend.delete('short')
+        assert await backend.get('short') is None
+        return server.connections, backend.stats()
+
+    connections, stats = _run(scenario)
+    assert connections == 1
+    assert stats['hits'] == 2 and stats['misses'] == 1 and stats['errors'] == 0
+
+
+def test_dropped_idle_connection_is_retried_on_a_fresh_one():
+    async def scenario(server, backend):
+        await backend.set('key', 'before restart')
+        server.drop_clients()
+        await asyncio.sleep(0.01)
+        value = await backend.get('key')
+        return value, server.connections, backend.stats()
+
+    value, connections, stats = _run(scenario)
+    assert value == 'before restart'
+    assert connections == 2
+    assert stats['reconnects'] == 1 and stats['errors'] == 0
+
+
+def test_undecodable_value_is_a_miss_and_deleted():
+    async def scenario(server, backend):
+        server.data[backend._key('corrupt').encode()] = b'z not zlib'
+        server.data[backend._key('foreign').encode()] = b'{"set": "by another app"}'
+        values = [await backend.get('corrupt'), await backend.get('foreign')]
+        return values, dict(server.data), backend.stats()
+
+    values, data, stats = _run(scenario)
+    assert values == [None, None]
+    assert data == {}
+    assert stats['decode_errors'] == 2 and stats['misses'] == 2 and stats['hits'] == 0
+
+
+def test_peek_is_not_counted():
+    async def scenario(server, backend):
+        await backend.set('key', 'value')
+        values = [await backend.peek('key'), await backend.peek('missing')]
+        return values, backend.stats()
+
+    values, stats = _run(scenario)
+    assert values == ['value', None]
+    assert stats['hits'] == 0 and stats['misses'] == 0
@@ -0,0 +1,75 @@
+"""
+Request tracing: spans, Server-Timing and work detached from a request.
+Run from the backend folder: python -m pytest tests
+"""
+import asyncio
+import re
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import tracing
+
+
+def _traced_app(sample_rate):
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        with tracing.span("cache"):
+            pass
+        for _ in range(2):
+            with tracing.span("db"):
+                await asyncio.sleep(0.005)
+        return {"ok": True}
+
+    return TestClient(tracing.TracingMiddleware(app, sample_rate=sample_rate))
+
+
+def test_sampled_request_gets_server_timing(monkeypatch):
+    exported = []
+    monkeypatch.setattr(tracing, "_export", exported.append)
+
+    response = _traced_app(1.0).get("/work")
+
+    entries = [entry.strip() for entry in response.headers["server-timing"].split(",")]
+    assert [entry.split(";")[0] for entry in entries] == ["cache", "db", "total"]
+    assert entries[1].endswith(';desc="2 calls"')
+    durations = [float(re.search(r"dur=([0-9.]+)", entry).group(1)) for entry in entries]
+    assert durations[1] >= 10 and durations[2] >= durations[1]
+    assert [t.name for t in exported] == ["GET /work"]
+    assert [name for name, *_ in exported[0].spans] == ["cache", "db", "db"]
+
+
+def test_unsampled_request_has_no_server_timing(monkeypatch):
+    exported = []
+    monkeypatch.setattr(tracing, "_export", exported.append)
+
+    response = _traced_app(0.0).get("/work")
+
+    assert response.json() == {"ok": True}
+    assert "server-timing" not in response.headers
+    assert exported == []
+
+
+def test_detached_work_records_into_its_own_trace(monkeypatch):
+    exported = []
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(tracing, "_export", exported.append)
+
+    async def background():
+        with tracing.span("pytrends"):
+            await asyncio.sleep(0)
+
+    async def request():
+        trace = tracing.Trace("GET /trends/maize")
+        tracing._current_trace.set(trace)
+        with tracing.span("trends_fetch"):
+            await asyncio.ensure_future(tracing.detached(background(), "trends fetch"))
+        return trace
+
+    trace = asyncio.run(request())
+
+    assert [name for name, *_ in trace.spans] == ["trends_fetch"]
+    assert [t.name for t in exported] == ["trends fetch"]
+    assert [(name, parent) for name, parent, *_ in exported[0].spans] == [("pytrends", None)]
@@ -0,0 +1,138 @@
+"""
+Trend store: folding a recent window into a stored series, eviction of
+series nobody requests any more, and backing off after a failed
+incremental refresh.
+Run from the backend folder: python -m pytest tests
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete
+
+from app import models
+from app.database import SessionLocal, engine
+from app.services import google_trends_service as gts
+from app.services import trend_store
+from app.services.rate_limiter import TokenBucket
+
+WEEKS = [{"date": (datetime(2026, 1, 4) + timedelta(weeks=i)).strftime('%Y-%m-%d'), "value": 50} for i in range(4)]
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    models.Base.metadata.create_all(bind=engine, tables=[models.TrendPoint.__table__])
+    db = SessionLocal()
+    db.execute(delete(models.TrendPoint))
+    db.commit()
+    db.close()
+
+
+def _days(start, values):
+    first = datetime.strptime(start, '%Y-%m-%d')
+    return [{"date": (first + timedelta(days=i)).strftime('%Y-%m-%d'), "value": v} for i, v in enumerate(values)]
+
+
+def test_merge_scales_recent_window_to_stored_weeks():
+    # Last stored week (2026-01-25) was fetched mid-week, so it reads low
+    stored = WEEKS[:3] + [{"date": "2026-01-25", "value": 20}]
+    recent = _days("2026-01-11", [25] * 14 + [30] * 7 + [40] * 3)
+
+    merged = trend_store.merge_incremental(stored, recent)
+
+    # Overlap 01-11 and 01-18: stored 100 vs recent 50, so recent doubles;
+    # the partial week is not part of the overlap but is replaced
+    assert merged == [
+        {"date": "2026-01-25", "value": 60},
+        {"date": "2026-02-01", "value": 80},
+    ]
+
+
+def test_merge_without_overlap_keeps_recent_scale():
+    recent = _days("2026-01-25", [30] * 7 + [40] * 7)
+
+    merged = trend_store.merge_incremental(WEEKS, recent)
+
+    assert merged == [
+        {"date": "2026-01-25", "value": 30},
+        {"date": "2026-02-01", "value": 40},
+    ]
+
+
+def test_merge_with_zero_overlap_keeps_recent_scale_and_drops_empty_weeks():
+    recent = _days("2026-01-18", [0] * 7 + [12] * 7 + [0] * 7)
+
+    merged = trend_store.merge_incremental(WEEKS, recent)
+
+    assert merged == [{"date": "2026-01-25", "value": 12}]
+    assert trend_store.merge_incremental([], recent) == []
+    assert trend_store.merge_incremental(WEEKS, []) == []
+
+
+def _stored_series():
+    return trend_store.get_store_stats()["series"]
+
+
+def test_evicts_series_not_refreshed_within_retention():
+    trend_store.save_points("kept", "KE", WEEKS, replace_all=True)
+    trend_store.save_points("abandoned", "KE", WEEKS, replace_all=True)
+    later = datetime.now(timezone.utc) + timedelta(days=trend_store.TRENDS_STORE_RETENTION_DAYS + 1)
+    # "kept" was refreshed just before the later sweep; "abandoned" never again
+    db = SessionLocal()
+    db.query(models.TrendPoint).filter(models.TrendPoint.keyword == "kept").update({"fetched_at": later})
+    db.commit()
+    db.close()
+
+    assert trend_store.evict_series(now=later) == 1
+
+    assert _stored_series() == 1
+    assert trend_store.load_series("kept", "KE")[0] == WEEKS
+    assert trend_store.load_series("abandoned", "KE") == ([], None)
+
+
+def test_caps_series_keeping_the_most_recently_refreshed(monkeypatch):
+    monkeypatch.setattr(trend_store, "TRENDS_STORE_MAX_SERIES", 2)
+    for keyword in ("oldest", "middle", "newest"):
+        trend_store.save_points(keyword, "KE", WEEKS, replace_all=True)
+
+    assert trend_store.evict_series() == 1
+
+    stats = trend_store.get_store_stats()
+    assert stats["series"] == 2 and stats["points"] == 2 * len(WEEKS)
+    assert trend_store.load_series("oldest", "KE") == ([], None)
+
+
+class FailingTrendReq:
+    calls = 0
+
+    def build_payload(self, *args, **kwargs):
+        FailingTrendReq.calls += 1
+
+    def interest_over_time(self):
+        raise Exception("The request failed: Google returned a response with code 500")
+
+
+def test_failed_incremental_refresh_backs_off(monkeypatch):
+    monkeypatch.setattr(gts, "_get_pytrends", FailingTrendReq)
+    monkeypatch.setattr(FailingTrendReq, "calls", 0)
+    monkeypatch.setattr(gts, "TRENDS_BATCH_WINDOW_MS", 0)
+    monkeypatch.setattr(gts, "MAX_RETRIES", 1)
+    monkeypatch.setattr(gts, "_rate_limiter", TokenBucket(rate=1000, burst=1000))
+    monkeypatch.setattr(gts._circuit, "failure_threshold", 0)
+    monkeypatch.setattr(gts, "_store_retry_after", {})
+    today = datetime.now(timezone.utc)
+    recent_weeks = [{"date": (today - timedelta(weeks=4 - i)).strftime('%Y-%m-%d'), "value": 50} for i in range(4)]
+    trend_store.save_points("backoff", "KE", recent_weeks, replace_all=True)
+    db = SessionLocal()
+    db.query(models.TrendPoint).update({"fetched_at": today - timedelta(days=1)})
+    db.commit()
+    db.close()
+
+    async def fetch_twice():
+        return [await gts._fetch_stored_series("backoff", "backoff", "KE", "KE", trend_store.STORE_TIMEFRAME) for _ in range(2)]
+
+    first, second = asyncio.run(fetch_twice())
+
+    assert first == second == recent_weeks
+    # Only the first miss went upstream; the second was served from the store
+    assert FailingTrendReq.calls == 1
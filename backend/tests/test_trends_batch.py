@@ -0,0 +1,34 @@
+"""
+Batch and comparison requests must not flood the cache warmer's popularity ranking.
+Run from the backend folder: python -m pytest tests
+"""
+import asyncio
+
+import pytest
+
+from app.services import cache_warmer, serper_service, trends_service
+from app.services import google_trends_service as gts
+
+
+@pytest.fixture(autouse=True)
+def demo_upstreams(monkeypatch):
+    monkeypatch.setattr(serper_service, "SERPER_API_KEY", None)
+    monkeypatch.setattr(gts, "USE_DEMO_DATA", True)
+    monkeypatch.setattr(cache_warmer, "_popularity", {})
+
+
+async def _drain(results):
+    return [result async for result in results]
+
+
+def test_batch_records_no_popularity():
+    results = asyncio.run(_drain(trends_service.iter_trend_analyses(["maize", "phone"], ["KE", "Nairobi"])))
+
+    assert len(results) == 4
+    assert cache_warmer._popularity == {}
+
+
+def test_comparison_records_one_hit_per_keyword():
+    asyncio.run(trends_service.get_regional_comparison(["maize", "phone"]))
+
+    assert sorted(cache_warmer._popularity) == [("maize", "KE"), ("phone", "KE")]
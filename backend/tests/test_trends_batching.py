@@ -0,0 +1,67 @@
+"""
+Keywords packed into one pytrends payload only cost extra payloads when a
+column was crushed by a more popular neighbour.
+Run from the backend folder: python -m pytest tests
+"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from app.services import google_trends_service as gts
+from app.services.rate_limiter import TokenBucket
+
+KEYWORDS = ["batch-a", "batch-b", "batch-c", "batch-d", "batch-e"]
+
+
+class StubTrendReq:
+    """Serves PEAKS[keyword] as a flat weekly column; unknown keywords have no data."""
+    payloads = []
+    peaks = {}
+
+    def build_payload(self, kw_list, **kwargs):
+        self.kw_list = kw_list
+        StubTrendReq.payloads.append(list(kw_list))
+
+    def interest_over_time(self):
+        columns = {kv: self.peaks[kv] for kv in self.kw_list if kv in self.peaks}
+        if not columns:
+            return pd.DataFrame()
+        top = max(columns.values())
+        dates = pd.date_range("2026-01-04", periods=12, freq="W")
+        frame = pd.DataFrame({kv: [round(peak * 100 / top)] * 12 for kv, peak in columns.items()}, index=dates)
+        frame["isPartial"] = False
+        return frame
+
+
+@pytest.fixture(autouse=True)
+def stub_upstream(monkeypatch):
+    monkeypatch.setattr(gts, "_get_pytrends", StubTrendReq)
+    monkeypatch.setattr(StubTrendReq, "payloads", [])
+    monkeypatch.setattr(gts, "TRENDS_BATCH_WINDOW_MS", 20)
+    monkeypatch.setattr(gts, "_rate_limiter", TokenBucket(rate=1000, burst=1000))
+
+
+async def _fetch_all():
+    return await asyncio.gather(*(gts._interest_over_time(kv, "today 12-m", "KE") for kv in KEYWORDS))
+
+
+def test_payload_without_data_is_not_refetched_per_keyword(monkeypatch):
+    monkeypatch.setattr(StubTrendReq, "peaks", {})
+
+    frames = asyncio.run(_fetch_all())
+
+    assert all(frame.empty for frame in frames)
+    assert StubTrendReq.payloads == [KEYWORDS]
+    assert not gts._batch_tasks
+
+
+def test_only_crushed_columns_are_refetched(monkeypatch):
+    # batch-e peaks at 5 next to batch-a's 100, below TRENDS_BATCH_MIN_PEAK
+    monkeypatch.setattr(StubTrendReq, "peaks", {"batch-a": 1000, "batch-b": 600, "batch-c": 400, "batch-d": 300, "batch-e": 50})
+
+    frames = asyncio.run(_fetch_all())
+
+    assert StubTrendReq.payloads == [KEYWORDS, ["batch-e"]]
+    assert [frame[kv].max() for kv, frame in zip(KEYWORDS, frames)] == [100] * 5
+    assert not gts._batch_tasks
@@ -0,0 +1,64 @@
+"""
+Concurrent cache misses for the same key share one upstream fetch.
+Run from the backend folder: python -m pytest tests
+"""
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from app.services import google_trends_service as gts
+from app.services import trend_store
+from app.services.rate_limiter import TokenBucket
+
+
+class SlowTrendReq:
+    """A real-looking series after a short delay, so callers overlap."""
+    payloads = []
+
+    def build_payload(self, kw_list, **kwargs):
+        self.kw_list = kw_list
+        SlowTrendReq.payloads.append(list(kw_list))
+
+    def interest_over_time(self):
+        time.sleep(0.05)
+        dates = pd.date_range("2026-01-04", periods=52, freq="W")
+        return pd.DataFrame({self.kw_list[0]: [30 + i for i in range(52)], "isPartial": False}, index=dates)
+
+
+@pytest.fixture(autouse=True)
+def slow_upstream(monkeypatch):
+    monkeypatch.setattr(gts, "USE_DEMO_DATA", False)
+    monkeypatch.setattr(gts, "_get_pytrends", SlowTrendReq)
+    monkeypatch.setattr(SlowTrendReq, "payloads", [])
+    monkeypatch.setattr(gts, "TRENDS_BATCH_WINDOW_MS", 0)
+    monkeypatch.setattr(gts, "_rate_limiter", TokenBucket(rate=1000, burst=1000))
+    monkeypatch.setattr(trend_store, "TRENDS_STORE_ENABLED", False)
+
+
+def test_concurrent_misses_share_one_upstream_fetch():
+    joins_before = gts._metrics["inflight_joins"]
+
+    async def scenario():
+        return await asyncio.gather(*(gts.get_historical_trends_with_status("coalesced") for _ in range(10)))
+
+    results = asyncio.run(scenario())
+
+    assert SlowTrendReq.payloads == [["coalesced"]]
+    assert gts._metrics["inflight_joins"] - joins_before == 9
+    assert all(status == "refreshed" for _, status in results)
+    assert all(data == results[0][0] and len(data) == 52 for data, _ in results)
+    assert not gts._inflight
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_fetch():
+    async def scenario():
+        first = asyncio.ensure_future(gts.get_historical_trends("shielded"))
+        second = asyncio.ensure_future(gts.get_historical_trends("shielded"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert len(asyncio.run(scenario())) == 52
+    assert SlowTrendReq.payloads == [["shielded"]]
@@ -0,0 +1,176 @@
+"""
+Stale-while-revalidate trend results: fresh, stale and refreshed entries,
+and failed refreshes never replacing cached trends with demo data.
+Run from the backend folder: python -m pytest tests
+"""
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from app.services import google_trends_service as gts
+from app.services import trend_store
+from app.services.rate_limiter import TokenBucket
+
+# 52 weekly points, unlike the 12 monthly points of generate_demo_historical_data
+REAL_SERIES = [{"date": f"2026-W{week:02d}", "value": 40 + week % 50} for week in range(1, 53)]
+
+
+class FailingTrendReq:
+    def build_payload(self, *args, **kwargs):
+        pass
+
+    def interest_over_time(self):
+        raise Exception("The request failed: Google returned a response with code 500")
+
+
+@pytest.fixture(autouse=True)
+def failing_upstream(monkeypatch):
+    monkeypatch.setattr(gts, "USE_DEMO_DATA", False)
+    monkeypatch.setattr(gts, "_get_pytrends", FailingTrendReq)
+    monkeypatch.setattr(gts, "CACHE_TTL", 1)
+    monkeypatch.setattr(gts, "BACKOFF_BASE", 0)
+    monkeypatch.setattr(gts, "TRENDS_BATCH_WINDOW_MS", 0)
+    monkeypatch.setattr(gts, "_rate_limiter", TokenBucket(rate=1000, burst=1000))
+    monkeypatch.setattr(gts._circuit, "failure_threshold", 0)
+    monkeypatch.setattr(gts._circuit, "rate_limit_threshold", 0)
+    monkeypatch.setattr(trend_store, "TRENDS_STORE_ENABLED", False)
+
+
+def _seed(keyword: str, region: str, age: float):
+    key = gts._cache_key(keyword, region, "today 12-m")
+    asyncio.run(gts._trends_cache.set(key, {"ts": time.time() - age, "data": REAL_SERIES}))
+    return key
+
+
+async def _serve_then_settle(keyword: str, region: str):
+    first = await gts.get_historical_trends_with_status(keyword, region=region)
+    # Let the background refresh started by the stale hit finish
+    while gts._inflight:
+        await asyncio.gather(*gts._inflight.values(), return_exceptions=True)
+    second = await gts.get_historical_trends_with_status(keyword, region=region)
+    return first, second
+
+
+@pytest.mark.parametrize("region", ["KE", "Nairobi"])
+def test_failed_stale_refresh_keeps_cached_series(region):
+    keyword = f"stale-{region.lower()}"
+    key = _seed(keyword, region, age=10)
+
+    (first, first_status), (second, second_status) = asyncio.run(_serve_then_settle(keyword, region))
+
+    assert first == REAL_SERIES and first_status == "stale"
+    # Still the real series, still stale (so it is retried), never "fresh" demo data
+    assert second == REAL_SERIES and second_status == "stale"
+    assert asyncio.run(gts._trends_cache.get(key))["data"] == REAL_SERIES
+
+
+def test_cold_miss_falls_back_to_demo_data():
+    data, status = asyncio.run(gts.get_historical_trends_with_status("cold-miss-keyword"))
+
+    assert status == "fallback"
+    assert len(data) == 12 and data != REAL_SERIES
+
+
+def test_expired_fallback_is_refetched_not_kept_as_stale():
+    keyword = "expired-fallback"
+    key = gts._cache_key(keyword, "KE", "today 12-m")
+    demo = gts.generate_demo_historical_data(keyword)
+    asyncio.run(gts._trends_cache.set(key, {"ts": time.time() - 10, "data": demo, "fallback": True}))
+    kept_before = gts._metrics["failed_refreshes_kept"]
+
+    data, status = asyncio.run(gts.get_historical_trends_with_status(keyword))
+
+    # Fetched again in the foreground, failed, and reported as a fallback
+    assert status == "fallback" and data != demo
+    assert gts._metrics["failed_refreshes_kept"] == kept_before
+    assert asyncio.run(gts._trends_cache.get(key))["fallback"] is True
+
+
+@pytest.mark.parametrize("region", ["KE", "Nairobi"])
+def test_failed_warmer_refresh_keeps_fresh_entry(region):
+    keyword = f"warm-{region.lower()}"
+    key = _seed(keyword, region, age=0)
+    written = asyncio.run(gts._trends_cache.get(key))["ts"]
+
+    assert asyncio.run(gts.refresh_historical_trends(keyword, region=region)) is None
+
+    entry = asyncio.run(gts._trends_cache.get(key))
+    assert entry["data"] == REAL_SERIES and entry["ts"] == written
+
+
+class EmptyRegionalTrendReq:
+    """No data for region-biased queries; a real series at country level."""
+    calls = []
+
+    def build_payload(self, kw_list, **kwargs):
+        self.kw_list = kw_list
+        EmptyRegionalTrendReq.calls.extend(kw_list)
+
+    def interest_over_time(self):
+        kv = self.kw_list[0]
+        if kv.endswith(" Kenya"):
+            return pd.DataFrame()
+        dates = pd.date_range("2026-01-04", periods=52, freq="W")
+        return pd.DataFrame({kv: [40 + i % 50 for i in range(52)], "isPartial": False}, index=dates)
+
+
+def test_empty_regional_result_is_refreshed_from_country_level(monkeypatch):
+    monkeypatch.setattr(gts, "_get_pytrends", EmptyRegionalTrendReq)
+    monkeypatch.setattr(EmptyRegionalTrendReq, "calls", [])
+    keyword = "empty-regional"
+    key = _seed(keyword, "Nairobi", age=10)
+    kept_before = gts._metrics["failed_refreshes_kept"]
+
+    (first, first_status), (second, second_status) = asyncio.run(_serve_then_settle(keyword, "Nairobi"))
+
+    assert first == REAL_SERIES and first_status == "stale"
+    # Re-cached from the country-level series, so no new regional query runs
+    assert second_status == "fresh" and second != REAL_SERIES and len(second) == 52
+    assert EmptyRegionalTrendReq.calls == [f"{keyword} Nairobi Kenya", keyword]
+    assert gts._metrics["failed_refreshes_kept"] == kept_before
+
+    # The warmer path reports the same refresh as a success
+    written = asyncio.run(gts._trends_cache.get(key))["ts"]
+    refreshed = asyncio.run(gts.refresh_historical_trends(keyword, region="Nairobi"))
+    assert refreshed == second
+    assert asyncio.run(gts._trends_cache.get(key))["ts"] > written
+
+
+class CountingTrendReq:
+    """Each payload returns a series whose values reveal which call made it."""
+    calls = 0
+
+    def build_payload(self, kw_list, **kwargs):
+        self.kw_list = kw_list
+        CountingTrendReq.calls += 1
+
+    def interest_over_time(self):
+        dates = pd.date_range("2026-01-04", periods=52, freq="W")
+        return pd.DataFrame({self.kw_list[0]: [CountingTrendReq.calls] * 52, "isPartial": False}, index=dates)
+
+
+def test_fresh_stale_refreshed_transitions(monkeypatch):
+    monkeypatch.setattr(gts, "_get_pytrends", CountingTrendReq)
+    monkeypatch.setattr(CountingTrendReq, "calls", 0)
+    keyword = "swr-transitions"
+    key = gts._cache_key(keyword, "KE", "today 12-m")
+
+    async def scenario():
+        statuses = []
+        for age_before in (None, None, 10, None):
+            if age_before is not None:
+                entry = await gts._trends_cache.get(key)
+                entry["ts"] = time.time() - age_before
+                await gts._trends_cache.set(key, entry)
+            data, status = await gts.get_historical_trends_with_status(keyword)
+            statuses.append((status, data[0]["value"]))
+            while gts._inflight:
+                await asyncio.gather(*gts._inflight.values(), return_exceptions=True)
+        return statuses
+
+    # Miss -> fetched; within TTL -> fresh; past TTL -> old data served while
+    # one background refresh runs; then the refreshed entry is fresh again
+    assert asyncio.run(scenario()) == [("refreshed", 1), ("fresh", 1), ("stale", 1), ("fresh", 2)]
+    assert CountingTrendReq.calls == 2
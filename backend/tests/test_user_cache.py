@@ -0,0 +1,48 @@
+"""
+Authenticated-user cache: filled by protected routes, dropped when the user changes.
+Run from the backend folder: python -m pytest tests
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.user_cache import get_cached_user
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def _register(client, name):
+    response = client.post("/auth/register", json={"email": f"{name}@example.com", "username": name, "password": "secret1"})
+    assert response.status_code == 200
+    body = response.json()
+    return body["user"]["id"], {"Authorization": f"Bearer {body['access_token']}"}
+
+
+def test_profile_update_invalidates_cached_user(client):
+    user_id, auth = _register(client, "cache-profile")
+    assert client.get("/auth/profile", headers=auth).json()["full_name"] == ""
+    assert get_cached_user(user_id) is not None
+
+    response = client.put("/auth/profile", json={"full_name": "Wanjiru"}, headers=auth)
+
+    assert response.status_code == 200
+    assert get_cached_user(user_id) is None
+    assert client.get("/auth/profile", headers=auth).json()["full_name"] == "Wanjiru"
+    assert get_cached_user(user_id).full_name == "Wanjiru"
+
+
+def test_password_change_invalidates_cached_user(client):
+    user_id, auth = _register(client, "cache-password")
+    client.get("/auth/profile", headers=auth)
+    old_hash = get_cached_user(user_id).password_hash
+
+    response = client.post("/auth/change-password", json={"current_password": "secret1", "new_password": "secret2"}, headers=auth)
+
+    assert response.status_code == 200
+    assert get_cached_user(user_id) is None
+    client.get("/auth/profile", headers=auth)
+    assert get_cached_user(user_id).password_hash != old_hash
+    assert client.post("/auth/login", json={"email": "cache-password@example.com", "password": "secret2"}).status_code == 200
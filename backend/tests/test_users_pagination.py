@@ -0,0 +1,90 @@
+"""
+/debug/users keyset pagination: pages chain through next_cursor without
+duplicates or gaps, even when rows change between requests.
+Run from the backend folder: python -m pytest tests
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.database import SessionLocal, engine
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    models.Base.metadata.create_all(bind=engine, tables=[models.User.__table__])
+    return TestClient(app)
+
+
+def _add_users(names):
+    db = SessionLocal()
+    try:
+        users = [models.User(email=f"{name}@example.com", username=name, password_hash="x") for name in names]
+        db.add_all(users)
+        db.commit()
+        return [user.id for user in users]
+    finally:
+        db.close()
+
+
+def _all_ids():
+    db = SessionLocal()
+    try:
+        return [row.id for row in db.query(models.User.id).order_by(models.User.id)]
+    finally:
+        db.close()
+
+
+def _page(client, after_id, limit):
+    response = client.get("/debug/users", params={"after_id": after_id, "limit": limit})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == len(body["users"])
+    return body
+
+
+def test_pages_cover_every_user_once(client):
+    _add_users([f"page{i}" for i in range(7)])
+    seen, cursor, pages = [], 0, 0
+    while cursor is not None:
+        body = _page(client, cursor, 3)
+        seen += [user["id"] for user in body["users"]]
+        cursor = body["next_cursor"]
+        pages += 1
+
+    assert seen == _all_ids()
+    assert pages == len(seen) // 3 + 1
+
+
+def test_changes_between_pages_do_not_shift_later_pages(client):
+    _add_users([f"shift{i}" for i in range(4)])
+    first = _page(client, 0, 2)
+    first_ids = [user["id"] for user in first["users"]]
+
+    # With OFFSET, deleting an already-served row would skip one unseen row
+    db = SessionLocal()
+    db.query(models.User).filter(models.User.id == first_ids[0]).delete()
+    db.commit()
+    db.close()
+    added = _add_users(["shift-late"])
+
+    seen, cursor = list(first_ids), first["next_cursor"]
+    while cursor is not None:
+        body = _page(client, cursor, 2)
+        seen += [user["id"] for user in body["users"]]
+        cursor = body["next_cursor"]
+
+    assert len(seen) == len(set(seen))
+    assert seen[1:] == _all_ids()
+    assert added[0] in seen
+
+
+def test_last_full_page_is_followed_by_an_empty_one(client):
+    ids = _all_ids()
+    body = _page(client, ids[-3], 3)
+
+    assert body["count"] == 2 and body["next_cursor"] is None
+    full = _page(client, ids[-4], 3)
+    assert full["next_cursor"] == ids[-1]
+    assert _page(client, full["next_cursor"], 3) == {"count": 0, "users": [], "next_cursor": None}